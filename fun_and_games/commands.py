@@ -0,0 +1,87 @@
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("fun-and-games-bench")
+@click.option("--voters", default=100, type=int, help="Simulated voters per question")
+@click.option("--questions", default=3, type=int, help="Questions to play")
+@click.option("--participants", default=10, type=int, help="Participants to vote for")
+@click.option("--concurrency", default=20, type=int, help="Concurrent voter threads")
+@click.option(
+	"--double-tap",
+	default=0.1,
+	type=float,
+	help="Share of voters that submit twice, to exercise deduplication",
+)
+@click.option(
+	"--poll-interval", default=1.0, type=float, help="Seconds between results polls"
+)
+@click.option("--keep", is_flag=True, help="Keep the synthetic session afterwards")
+@pass_context
+def fun_and_games_bench(
+	context, voters, questions, participants, concurrency, double_tap, poll_interval, keep
+):
+	"""Simulate a live game against the api module and report latency and vote integrity"""
+	from fun_and_games.fun_and_games.loadtest import run
+
+	site = get_site(context)
+	report = run(
+		site,
+		voters=voters,
+		questions=questions,
+		participants=participants,
+		concurrency=concurrency,
+		double_tap=double_tap,
+		poll_interval=poll_interval,
+		keep=keep,
+	)
+
+	click.echo(
+		f"\nSession {report['session_id']}: {report['questions']} questions x "
+		f"{report['voters']} voters in {report['elapsed_seconds']:.1f}s\n"
+	)
+	click.echo(
+		f"{'endpoint':<22}{'calls':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}"
+		f"{'p99 ms':>10}{'req/s':>10}{'queries':>10}"
+	)
+	for endpoint, stats in report["endpoints"].items():
+		click.echo(
+			f"{endpoint:<22}{stats['calls']:>8}{stats['errors']:>8}"
+			f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+			f"{stats['throughput']:>10.1f}{stats['queries_per_call']:>10.2f}"
+		)
+
+	votes = report["votes"]
+	click.echo(
+		f"\nVotes: {votes['accepted']} accepted, {votes['stored']} stored, "
+		f"{votes['lost']} lost, {votes['duplicates']} duplicates, "
+		f"{votes['unexpected']} unexpected"
+	)
+
+
+@click.command("fun-and-games-import-questions")
+@click.argument("file_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", default=500, type=int, help="Questions per bulk insert")
+@click.option(
+	"--format",
+	"file_format",
+	type=click.Choice(["json", "ndjson", "csv"]),
+	help="File format; detected from the extension by default",
+)
+@pass_context
+def fun_and_games_import_questions(context, file_path, batch_size, file_format):
+	"""Stream questions from a JSON, NDJSON or CSV file into Game Question"""
+	import frappe
+
+	from fun_and_games.import_questions import import_from_file
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		if not import_from_file(file_path, batch_size, file_format):
+			raise click.ClickException("Import failed")
+	finally:
+		frappe.destroy()
+
+
+commands = [fun_and_games_bench, fun_and_games_import_questions]
@@ -8,6 +8,8 @@ Run via: bench --site [site-name] execute fun_and_games.create_production_sessio
 
 import frappe
 
+from fun_and_games.fun_and_games.bulk_create import create_session, create_sessions
+
 
 def create_team_sessions():
     """Create 3 team sessions with participants and questions - FLEXIBLE based on question flags"""
@@ -78,62 +80,17 @@ def create_team_sessions():
         },
     ]
 
-    created_sessions = []
-
-    for session_config in sessions_config:
-        try:
-            print(f"📝 Creating session: {session_config['session_name']}")
-
-            # Create session
-            session_doc = frappe.get_doc(
-                {
-                    "doctype": "Game Session",
-                    "session_name": session_config["session_name"],
-                    "team_group": session_config["team_group"],
-                    "description": session_config["description"],
-                    "status": "Draft",
-                }
-            )
-            session_doc.insert(ignore_permissions=True)
-
-            # Add questions to session
-            for i, question_id in enumerate(session_config["questions"]):
-                session_question = frappe.get_doc(
-                    {
-                        "doctype": "Session Question",
-                        "session": session_doc.name,
-                        "question": question_id,
-                        "display_order": i + 1,
-                        "is_completed": 0,
-                    }
-                )
-                session_question.insert(ignore_permissions=True)
-
-            # Add participants to session
-            for i, participant in enumerate(session_config["participants"]):
-                session_participant = frappe.get_doc(
-                    {
-                        "doctype": "Session Participant",
-                        "session": session_doc.name,
-                        "participant_name": participant["participant_name"],
-                        "team": participant["team"],
-                        "display_order": i + 1,
-                    }
-                )
-                session_participant.insert(ignore_permissions=True)
-
-            created_sessions.append(session_doc.name)
-            print(
-                f"✅ Created session: {session_config['session_name']} ({session_doc.name})"
-            )
-
-        except Exception as e:
-            print(
-                f"❌ Error creating session {session_config['session_name']}: {str(e)}"
-            )
-            continue
-
-    frappe.db.commit()
+    try:
+        # All three sessions go in together, one bulk insert per doctype
+        created_sessions = create_sessions(sessions_config)
+        frappe.db.commit()
+    except Exception as e:
+        frappe.db.rollback()
+        print(f"❌ Error creating sessions: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+    for session_config, session_id in zip(sessions_config, created_sessions):
+        print(f"✅ Created session: {session_config['session_name']} ({session_id})")
 
     print(f"\n🎉 Successfully created {len(created_sessions)} sessions!")
     print("Sessions created:")
@@ -169,53 +126,23 @@ def create_custom_session(session_name, description, participant_list):
     print(f"📊 Found {len(custom_questions)} questions available for custom sessions")
 
     try:
-        # Create session
-        session_doc = frappe.get_doc(
-            {
-                "doctype": "Game Session",
-                "session_name": session_name,
-                "team_group": "Custom",
-                "description": description,
-                "status": "Draft",
-            }
+        session_id = create_session(
+            session_name,
+            "Custom",
+            description,
+            [question["name"] for question in custom_questions],
+            participant_list,
         )
-        session_doc.insert(ignore_permissions=True)
-
-        # Add ALL available questions to session
-        for i, question in enumerate(custom_questions):
-            session_question = frappe.get_doc(
-                {
-                    "doctype": "Session Question",
-                    "session": session_doc.name,
-                    "question": question["name"],
-                    "display_order": i + 1,
-                    "is_completed": 0,
-                }
-            )
-            session_question.insert(ignore_permissions=True)
-
-        # Add participants to session
-        for i, participant in enumerate(participant_list):
-            session_participant = frappe.get_doc(
-                {
-                    "doctype": "Session Participant",
-                    "session": session_doc.name,
-                    "participant_name": participant["participant_name"],
-                    "team": participant["team"],
-                    "display_order": i + 1,
-                }
-            )
-            session_participant.insert(ignore_permissions=True)
-
         frappe.db.commit()
 
-        print(f"✅ Created custom session: {session_name} ({session_doc.name})")
+        print(f"✅ Created custom session: {session_name} ({session_id})")
         print(f"   - {len(custom_questions)} questions added")
         print(f"   - {len(participant_list)} participants added")
 
-        return {"success": True, "session_id": session_doc.name}
+        return {"success": True, "session_id": session_id}
 
     except Exception as e:
+        frappe.db.rollback()
         print(f"❌ Error creating custom session: {str(e)}")
         return {"success": False, "error": str(e)}
 
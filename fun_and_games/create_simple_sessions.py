@@ -5,6 +5,8 @@ Create Simple Team Sessions
 
 import frappe
 
+from fun_and_games.fun_and_games.bulk_create import create_sessions
+
 
 def create_simple_sessions():
     """Create team sessions with questions"""
@@ -82,61 +84,34 @@ def create_simple_sessions():
         },
     ]
 
-    created_count = 0
-
+    sessions_to_create = []
     for session_config in sessions:
         if not session_config["questions"]:
             print(f"⚠️  Skipping {session_config['session_name']} - no questions")
             continue
 
-        try:
-            # Create session document
-            session_doc = frappe.get_doc(
-                {
-                    "doctype": "Game Session",
-                    "session_name": session_config["session_name"],
-                    "team_group": session_config["team_group"],
-                    "description": session_config["description"],
-                    "status": "Draft",
-                }
-            )
-            session_doc.insert(ignore_permissions=True)
-
-            # Add questions to session
-            for i, question in enumerate(session_config["questions"]):
-                session_question = frappe.get_doc(
-                    {
-                        "doctype": "Session Question",
-                        "session": session_doc.name,
-                        "question": question["name"],
-                        "question_order": i + 1,
-                    }
-                )
-                session_question.insert(ignore_permissions=True)
-
-            # Add participants to session
-            for i, participant in enumerate(session_config["participants"]):
-                session_participant = frappe.get_doc(
-                    {
-                        "doctype": "Session Participant",
-                        "session": session_doc.name,
-                        "participant_name": participant["participant_name"],
-                        "team": participant["team"],
-                        "display_order": i + 1,
-                    }
-                )
-                session_participant.insert(ignore_permissions=True)
-
-            print(
-                f"✅ Created: {session_config['session_name']} ({len(session_config['questions'])} questions)"
+        sessions_to_create.append(
+            dict(
+                session_config,
+                questions=[q["name"] for q in session_config["questions"]],
             )
-            created_count += 1
+        )
 
-        except Exception as e:
-            print(f"❌ Error creating {session_config['session_name']}: {str(e)}")
-
-    frappe.db.commit()
-    print(f"\n🎉 Created {created_count} sessions successfully!")
+    try:
+        # One bulk insert per doctype for all sessions
+        create_sessions(sessions_to_create)
+        frappe.db.commit()
+    except Exception as e:
+        frappe.db.rollback()
+        print(f"❌ Error creating sessions: {str(e)}")
+        return
+
+    for session_config in sessions_to_create:
+        print(
+            f"✅ Created: {session_config['session_name']} ({len(session_config['questions'])} questions)"
+        )
+
+    print(f"\n🎉 Created {len(sessions_to_create)} sessions successfully!")
 
 
 if __name__ == "__main__":
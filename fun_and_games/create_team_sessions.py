@@ -131,21 +131,23 @@ def get_questions_for_session(filters):
 
 
 def create_session_with_api(session_name, team_group, description, questions, participants):
-    """Create session using the existing API"""
+    """Create session using the bulk creation engine shared with the create_session API"""
     
-    # Format questions for API
-    question_ids = [q['name'] for q in questions]
+    from fun_and_games.fun_and_games.bulk_create import create_session
     
-    # Use the existing create_session API
-    from fun_and_games.fun_and_games.api import create_session
-    
-    return create_session(
-        session_name=session_name,
-        team_group=team_group, 
-        description=description,
-        questions=question_ids,
-        participants=participants
-    )
+    try:
+        session_id = create_session(
+            session_name=session_name,
+            team_group=team_group,
+            description=description,
+            questions=[q['name'] for q in questions],
+            participants=participants
+        )
+        frappe.db.commit()
+        return {"success": True, "session_id": session_id}
+    except Exception as e:
+        frappe.db.rollback()
+        return {"success": False, "message": str(e)}
 
 
 if __name__ == "__main__":
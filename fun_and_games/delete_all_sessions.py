@@ -4,15 +4,24 @@ Delete All Sessions Script
 
 Cleans up all existing sessions, participants, votes, and session questions
 so you can test the new flexible session creation scripts with a clean slate.
+Rows are deleted in small chunks, so a running game elsewhere is not stalled.
 
 Run via: bench --site [site-name] execute fun_and_games.delete_all_sessions.delete_all_sessions
+Archive first: bench --site [site-name] execute fun_and_games.delete_all_sessions.delete_all_sessions --kwargs "{'archive': True}"
 """
 
 import frappe
 
+from fun_and_games.fun_and_games.teardown import (
+    CHUNK_SIZE,
+    JsonArchive,
+    delete_sessions,
+    print_progress,
+)
 
-def delete_all_sessions():
-    """Delete all sessions and related data"""
+
+def delete_all_sessions(archive=False, chunk_size=CHUNK_SIZE):
+    """Delete all sessions and related data, optionally archiving the rows first"""
     
     print("🗑️  Deleting all existing sessions...")
     
@@ -33,21 +42,16 @@ def delete_all_sessions():
             print("✅ No sessions to delete!")
             return {"success": True, "message": "No sessions found"}
         
-        # Delete in correct order (child tables first)
-        print("\n🗑️  Deleting votes...")
-        frappe.db.sql("DELETE FROM `tabGame Vote`")
-        
-        print("🗑️  Deleting session participants...")
-        frappe.db.sql("DELETE FROM `tabSession Participant`")
-        
-        print("🗑️  Deleting session questions...")
-        frappe.db.sql("DELETE FROM `tabSession Question`")
+        archiver = JsonArchive() if archive else None
         
-        print("🗑️  Deleting sessions...")
-        frappe.db.sql("DELETE FROM `tabGame Session`")
+        # Child tables first, in short chunked transactions
+        print("\n🗑️  Deleting sessions in chunks...")
+        delete_sessions(
+            chunk_size=int(chunk_size), archive=archiver, progress=print_progress
+        )
         
-        # Commit changes
-        frappe.db.commit()
+        if archiver:
+            print(f"\n📦 Archived rows to {archiver.path}")
         
         print("\n✅ All sessions deleted successfully!")
         print("🎯 Ready for fresh session creation with new flexible scripts")
@@ -0,0 +1,201 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+"""
+Everything the admin console shows, in one payload.
+
+The state is split into sections (session list, controlled session, its
+questions, its participants). The version handed to the client is the
+session list and session versions followed by a short digest per section.
+When the client sends it back, an unchanged state costs a couple of Redis
+reads and the reply carries only the sections whose digest differs.
+"""
+
+import hashlib
+
+import frappe
+from frappe.utils import cint, get_datetime
+
+from fun_and_games.fun_and_games import session_cache, versioning
+
+SECTIONS = ("sessions", "session", "questions", "participants")
+
+SESSION_PAGE_SIZE = 25
+MAX_SESSION_PAGE_SIZE = 200
+
+
+def get_session_list(
+    status=None, team_group=None, cursor=None, limit=None, with_counts=False
+):
+    """One page of sessions, newest first, and the cursor of the next page (or None)
+
+    Keyset pagination on (creation, name): a page costs the same however deep
+    it is. With with_counts, every row gets its participant and vote counts.
+    """
+    limit = min(cint(limit) or SESSION_PAGE_SIZE, MAX_SESSION_PAGE_SIZE)
+
+    conditions = []
+    values = {"limit": limit + 1}
+    if status:
+        conditions.append("status = %(status)s")
+        values["status"] = status
+    if team_group:
+        conditions.append("team_group = %(team_group)s")
+        values["team_group"] = team_group
+    if cursor:
+        creation, _, name = cursor.partition("|")
+        conditions.append(
+            "(creation < %(creation)s OR (creation = %(creation)s AND name < %(name)s))"
+        )
+        values.update(creation=get_datetime(creation), name=name)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sessions = frappe.db.sql(
+        f"""
+        SELECT name, session_name, join_code, team_group, status, session_date,
+               creation
+        FROM `tabGame Session`
+        {where}
+        ORDER BY creation DESC, name DESC
+        LIMIT %(limit)s
+    """,
+        values,
+        as_dict=True,
+    )
+
+    next_cursor = None
+    if len(sessions) > limit:
+        sessions = sessions[:limit]
+        last = sessions[-1]
+        next_cursor = f"{last.creation}|{last.name}"
+
+    if with_counts:
+        _add_counts(sessions)
+
+    for session in sessions:
+        del session["creation"]
+
+    return sessions, next_cursor
+
+
+def _add_counts(sessions):
+    """Participant and vote counts for a page of sessions, in one grouped query"""
+    if not sessions:
+        return
+
+    names = tuple(session.name for session in sessions)
+    counts = {}
+    for kind, session, count in frappe.db.sql(
+        """
+        SELECT 'participants', session, COUNT(*)
+        FROM `tabSession Participant`
+        WHERE session IN %(names)s
+        GROUP BY session
+        UNION ALL
+        SELECT 'votes', session, COUNT(*)
+        FROM `tabGame Vote`
+        WHERE session IN %(names)s
+        GROUP BY session
+        UNION ALL
+        SELECT 'archived_votes', name, archived_votes
+        FROM `tabGame Session`
+        WHERE name IN %(names)s
+    """,
+        {"names": names},
+    ):
+        counts[(kind, session)] = count
+
+    for session in sessions:
+        session.participant_count = counts.get(("participants", session.name), 0)
+        # Votes of completed sessions move to the archive; they still count
+        session.vote_count = counts.get(("votes", session.name), 0) + (
+            counts.get(("archived_votes", session.name)) or 0
+        )
+
+
+def get_session_questions(session_id):
+    return frappe.db.sql(
+        """
+        SELECT sq.name, sq.question_order, sq.is_completed,
+               gq.name as question_id, gq.question_text
+        FROM `tabSession Question` sq
+        JOIN `tabGame Question` gq ON sq.question = gq.name
+        WHERE sq.session = %s
+        ORDER BY sq.question_order ASC
+    """,
+        (session_id,),
+        as_dict=True,
+    )
+
+
+def get_session_participants(session_id):
+    return frappe.db.get_all(
+        "Session Participant",
+        filters={"session": session_id},
+        fields=["name", "participant_name", "team", "display_order"],
+        order_by="display_order ASC, participant_name ASC",
+    )
+
+
+def get_session_state(snapshot):
+    """The controlled session's live state, as get_active_session reports it"""
+    time_remaining = session_cache.get_time_remaining(snapshot)
+    return {
+        "session": snapshot.session,
+        "question": snapshot.question,
+        "time_remaining": time_remaining,
+        "voting_open": time_remaining > 0,
+    }
+
+
+def _base_version(session_id):
+    """Changes whenever any section may have changed; only reads Redis"""
+    list_version = versioning.get_version(versioning.SESSION_LIST)
+    if not session_id:
+        return str(list_version)
+
+    snapshot = session_cache.get_session_snapshot(session_id)
+    voting_open = bool(snapshot and session_cache.get_time_remaining(snapshot))
+    session_tag = versioning.session_version_tag(session_id, int(voting_open))
+    return f"{list_version}:{session_tag}"
+
+
+def _digest(section):
+    return hashlib.sha1(frappe.as_json(section).encode()).hexdigest()[:10]
+
+
+def get_state(session_id=None, since_version=None):
+    """Admin console state for a session (default: the active one), as a delta.
+
+    Returns the sections that differ from `since_version` plus the new
+    version; `unchanged` is set when nothing at all changed.
+    """
+    session_id = session_cache.resolve_session_id(session_id)
+    base = _base_version(session_id)
+
+    since_base, _, since_digests = (since_version or "").partition("~")
+    if since_base == base:
+        return {"session_id": session_id, "version": since_version, "unchanged": True}
+
+    snapshot = session_cache.get_session_snapshot(session_id) if session_id else None
+    sessions, next_cursor = get_session_list()
+    sections = {
+        "sessions": {"sessions": sessions, "next_cursor": next_cursor},
+        "session": get_session_state(snapshot) if snapshot else None,
+        "questions": get_session_questions(session_id) if snapshot else [],
+        "participants": get_session_participants(session_id) if snapshot else [],
+    }
+
+    digests = [_digest(sections[name]) for name in SECTIONS]
+    previous = dict(zip(SECTIONS, since_digests.split(".")))
+
+    state = {
+        "session_id": session_id,
+        "version": f"{base}~{'.'.join(digests)}",
+        "unchanged": False,
+    }
+    for name, digest in zip(SECTIONS, digests):
+        if previous.get(name) != digest:
+            state[name] = sections[name]
+
+    return state
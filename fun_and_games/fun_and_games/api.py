@@ -3,105 +3,97 @@
 
 import frappe
 from frappe import _
-from frappe.utils import now_datetime
+from frappe.utils import cint, now_datetime
+
+from fun_and_games.fun_and_games import (
+    admin_state,
+    bulk_create,
+    instrumentation,
+    leaderboard,
+    live,
+    question_catalog,
+    question_timer,
+    result_snapshots,
+    roster,
+    session_cache,
+    session_jobs,
+    tally,
+    teardown,
+    versioning,
+    vote_claims,
+    vote_queue,
+    voter_token,
+)
 
 
 @frappe.whitelist(allow_guest=True)
-def get_questions_from_settings():
-    """Get questions from Game Settings JSON field"""
+@instrumentation.instrument
+def get_questions_from_settings(track=None):
+    """Get questions from Game Settings JSON field, optionally for one track flag"""
     try:
-        import json
-
-        settings = frappe.get_single("Game Settings")
-        questions_json = settings.get("questions_json", "[]")
-
-        if questions_json:
-            questions = json.loads(questions_json)
-        else:
-            # Fallback sample questions
-            questions = [
-                {
-                    "name": "Q1",
-                    "question_text": "Who is most likely to work late?",
-                    "for_leadership_track": 1,
-                    "for_backend_track": 1,
-                    "for_frontend_track": 0,
-                    "for_custom_sessions": 0,
-                },
-                {
-                    "name": "Q2",
-                    "question_text": "Who is most likely to debug on weekends?",
-                    "for_leadership_track": 0,
-                    "for_backend_track": 1,
-                    "for_frontend_track": 1,
-                    "for_custom_sessions": 0,
-                },
-            ]
-
-        return {"questions": questions}
+        return {"questions": question_catalog.get_questions(track)}
 
     except Exception as e:
         frappe.log_error(f"Error getting questions from settings: {str(e)}")
         return {"questions": []}
 
 
+def _active_session_etag(session=None, include_voting_state=False):
+    session_id = session_cache.resolve_session_id(session)
+    if not session_id:
+        return None
+
+    if not include_voting_state:
+        return versioning.session_etag(session_id)
+
+    # Voting closes at the deadline, and stops taking votes after the grace period,
+    # without a version bump, so the ETag has to follow both. Each change lets one
+    # poll through to the endpoint, which nudges the close of an expired question.
+    snapshot = session_cache.get_session_snapshot(session_id)
+    voting_open = bool(snapshot and session_cache.get_time_remaining(snapshot))
+    accepting_votes = bool(snapshot and session_cache.is_accepting_votes(snapshot))
+    return versioning.session_etag(session_id, int(voting_open), int(accepting_votes))
+
+
+def _session_etag(session_id=None):
+    session_id = session_cache.resolve_session_id(session_id)
+    return versioning.session_etag(session_id) if session_id else None
+
+
 @frappe.whitelist(allow_guest=True)
-def get_active_session():
-    """Returns current active session with question and participants"""
+@instrumentation.instrument
+@versioning.conditional(lambda session=None, **options: _voter_state_etag(session))
+def get_active_session(session=None, compact=0, roster_version=None):
+    """Returns an active session (name or join code) with question and participants
+
+    With compact, participants come as the roster, included only when
+    roster_version is not the current one.
+    """
     try:
-        # Get active session
-        active_session = frappe.db.get_value(
-            "Game Session",
-            {"status": "Active"},
-            [
-                "name",
-                "session_name",
-                "current_question",
-                "question_start_time",
-                "voting_deadline",
-            ],
-            as_dict=True,
-        )
+        snapshot = session_cache.get_snapshot(session)
 
-        if not active_session:
+        if not snapshot or snapshot.session.status != "Active":
             return {"success": False, "message": "No active session found"}
 
-        # Get current question details if exists
-        question_data = None
-        if active_session.current_question:
-            question_data = frappe.db.get_value(
-                "Game Question",
-                active_session.current_question,
-                ["name", "question_text"],
-                as_dict=True,
-            )
-
-        # Get session participants
-        participants = frappe.db.get_all(
-            "Session Participant",
-            filters={"session": active_session.name},
-            fields=["name", "participant_name", "team"],
-            order_by="display_order ASC, participant_name ASC",
-        )
+        question_timer.close_if_due(snapshot)
+        # Hand the phone its signed voter token before it votes
+        voter_token.get_voter_id(issue=True)
 
-        # Calculate time remaining
-        time_remaining = 0
-        voting_open = False
-        if active_session.voting_deadline:
-            remaining_seconds = (
-                active_session.voting_deadline - now_datetime()
-            ).total_seconds()
-            time_remaining = max(0, int(remaining_seconds))
-            voting_open = time_remaining > 0
+        time_remaining = session_cache.get_time_remaining(snapshot)
 
-        return {
+        response = {
             "success": True,
-            "session": active_session,
-            "question": question_data,
-            "participants": participants,
+            "session": snapshot.session,
+            "question": snapshot.question,
             "time_remaining": time_remaining,
-            "voting_open": voting_open,
+            "voting_open": time_remaining > 0,
         }
+        if cint(compact):
+            response.update(roster.get_roster(snapshot, roster_version))
+        else:
+            response["participants"] = snapshot.participants
+
+        return response
 
     except Exception as e:
         frappe.log_error(f"Error in get_active_session: {str(e)}")
@@ -111,73 +103,188 @@ def get_active_session():
         }
 
 
+def _voter_state_etag(session=None, **options):
+    etag = _active_session_etag(session, include_voting_state=True)
+    # Per voter: the response carries the voter's own vote, and a phone without a
+    # token must not be answered with a 304 that never issues it one
+    return etag and f'{etag[:-1]}-{voter_token.get_voter_id(issue=True)}"'
+
+
+def _voter_state(snapshot, voted_participant=None, compact=False, roster_version=None):
+    """Everything vote.html shows, for one voter, from one session snapshot"""
+    session = snapshot.session
+    if voted_participant is None and session.current_question:
+        voted_participant = vote_claims.get_vote(
+            session.name,
+            session.current_question,
+            vote_claims.get_voter_identifier(),
+            vote_claims.get_claim_ttl(snapshot),
+        )
+
+    time_remaining = session_cache.get_time_remaining(snapshot)
+    state = {
+        "session": session,
+        "question": snapshot.question,
+        "time_remaining": time_remaining,
+        "voting_open": time_remaining > 0,
+        "has_voted": bool(voted_participant),
+    }
+    if compact:
+        state.update(roster.get_roster(snapshot, roster_version))
+        state["voted_index"] = roster.get_index(snapshot, voted_participant)
+    else:
+        state["participants"] = snapshot.participants
+        state["voted_participant"] = voted_participant
+
+    return state
+
+
 @frappe.whitelist(allow_guest=True)
-def submit_vote(participant):
-    """Saves vote for current active session, prevents duplicates by IP"""
+@instrumentation.instrument
+@versioning.conditional(_voter_state_etag)
+def get_voter_state(session=None, compact=0, roster_version=None):
+    """Session, question, participants, timer and this voter's vote in one call"""
     try:
-        # Get active session
-        active_session = frappe.db.get_value(
-            "Game Session",
-            {"status": "Active"},
-            ["name", "current_question", "voting_deadline"],
-            as_dict=True,
+        snapshot = session_cache.get_snapshot(session)
+
+        if not snapshot or snapshot.session.status != "Active":
+            return {"success": False, "message": "No active session found"}
+
+        question_timer.close_if_due(snapshot)
+        # Page load: hand the phone its signed voter token before it votes
+        voter_token.get_voter_id(issue=True)
+        voter_state = _voter_state(
+            snapshot, compact=cint(compact), roster_version=roster_version
         )
+        return {"success": True, **voter_state}
 
-        if not active_session:
+    except Exception as e:
+        frappe.log_error(f"Error in get_voter_state: {str(e)}")
+        return {
+            "success": False,
+            "message": "An error occurred while fetching the session",
+        }
+
+
+@frappe.whitelist(allow_guest=True)
+@instrumentation.instrument
+def submit_vote(
+    participant=None, session=None, participant_index=None, roster_version=None
+):
+    """Saves vote for an active session's current question, one per voter token
+
+    The participant is a Session Participant name, or an index into the
+    roster of the given roster_version.
+    """
+    try:
+        snapshot = session_cache.get_snapshot(session)
+
+        if not snapshot or snapshot.session.status != "Active":
             return {"success": False, "message": "No active session found"}
 
+        active_session = snapshot.session
         if not active_session.current_question:
             return {"success": False, "message": "No active question in session"}
 
-        # Check if voting is still open (with 3-second grace period)
-        if active_session.voting_deadline:
-            grace_period = 3  # seconds
-            deadline_with_grace = active_session.voting_deadline.replace(
-                second=active_session.voting_deadline.second + grace_period
-            )
-            if now_datetime() > deadline_with_grace:
-                return {"success": False, "message": "Voting time has expired"}
+        # Check if voting is still open (with the configured grace period)
+        if not session_cache.is_accepting_votes(snapshot):
+            question_timer.close_if_due(snapshot)
+            return {"success": False, "message": "Voting time has expired"}
+
+        compact = participant_index is not None
+        if compact:
+            # An index only means something against the roster the voter was shown
+            if roster_version != snapshot.roster_version:
+                return {
+                    "success": False,
+                    "message": "The participant list has changed, please vote again",
+                    "voter_state": _voter_state(snapshot, compact=True),
+                }
 
-        # Get client IP with user agent for better uniqueness
-        voter_ip = frappe.local.request_ip or "unknown"
-        user_agent = frappe.get_request_header("User-Agent") or "unknown"
-        voter_identifier = f"{voter_ip}_{hash(user_agent) % 10000}"
+            participant_index = cint(participant_index)
+            if 0 <= participant_index < len(snapshot.participants):
+                participant = snapshot.participants[participant_index].name
 
-        # Check if user already voted for this question in this session
-        existing_vote = frappe.db.exists(
-            "Game Vote",
-            {
-                "session": active_session.name,
-                "question": active_session.current_question,
-                "voter_ip": voter_identifier,
-            },
-        )
+        # Validate participant exists in this session
+        if participant not in snapshot.participant_ids:
+            return {"success": False, "message": "Invalid participant for this session"}
 
-        if existing_vote:
+        session_id = active_session.name
+        question_id = active_session.current_question
+
+        # Only a signed token issued by a page load can vote; no token, no new identity
+        voter_identifier = vote_claims.get_voter_identifier()
+        if not voter_identifier:
             return {
                 "success": False,
-                "message": "You have already voted for this question!",
+                "message": "Please reload the page before voting",
             }
 
-        # Validate participant exists in this session
-        if not frappe.db.exists(
-            "Session Participant", {"name": participant, "session": active_session.name}
+        # One atomic claim decides whether this is the voter's first vote
+        if not vote_claims.claim(
+            session_id,
+            question_id,
+            voter_identifier,
+            participant,
+            vote_claims.get_claim_ttl(snapshot),
         ):
-            return {"success": False, "message": "Invalid participant for this session"}
-
-        # Create vote
-        vote_doc = frappe.get_doc(
-            {
-                "doctype": "Game Vote",
-                "session": active_session.name,
-                "question": active_session.current_question,
-                "participant": participant,
-                "voter_ip": voter_identifier,
+            return {
+                "success": False,
+                "message": "You have already voted for this question!",
+                "voter_state": _voter_state(snapshot, None, compact, roster_version),
             }
-        )
-        vote_doc.insert(ignore_permissions=True)
 
-        return {"success": True, "message": "Vote submitted successfully!"}
+        if snapshot.fast_vote_ingestion:
+            # Fast path: a background job writes the claimed vote
+            vote_queue.enqueue_vote(
+                session_id, question_id, participant, voter_identifier
+            )
+        else:
+            vote_doc = frappe.get_doc(
+                {
+                    "doctype": "Game Vote",
+                    "session": session_id,
+                    "question": question_id,
+                    "participant": participant,
+                    "voter_ip": voter_identifier,
+                }
+            )
+            vote_doc.flags.vote_claimed = True
+            try:
+                vote_doc.insert(ignore_permissions=True)
+            except frappe.UniqueValidationError:
+                # Redis had lost the claim; the unique key still caught the repeat
+                frappe.db.rollback()
+                frappe.clear_messages()
+                # The claim names the rejected pick; restore it from the stored vote
+                vote_claims.release(session_id, question_id, voter_identifier)
+                stored_participant = vote_claims.get_vote(
+                    session_id,
+                    question_id,
+                    voter_identifier,
+                    vote_claims.get_claim_ttl(snapshot),
+                )
+                return {
+                    "success": False,
+                    "message": "You have already voted for this question!",
+                    "voter_state": _voter_state(
+                        snapshot, stored_participant, compact, roster_version
+                    ),
+                }
+            except Exception:
+                vote_claims.release(session_id, question_id, voter_identifier)
+                raise
+
+            tally.record_vote(session_id, question_id, participant, vote_doc.name)
+
+        # The voter's own state changed; results pages hear of it from the tally
+        versioning.bump_version_after_commit(session_id)
+
+        return {
+            "success": True,
+            "message": "Vote submitted successfully!",
+            "voter_state": _voter_state(snapshot, participant, compact, roster_version),
+        }
 
     except Exception as e:
         frappe.log_error(f"Error in submit_vote: {str(e)}")
@@ -188,49 +295,51 @@ def submit_vote(participant):
 
 
 @frappe.whitelist(allow_guest=True)
-def get_results():
-    """Returns vote tallies for active session's current question"""
+@instrumentation.instrument
+@versioning.conditional(lambda session=None, **options: _active_session_etag(session))
+def get_results(session=None, compact=0, roster_version=None):
+    """Returns vote tallies for a session's current question
+
+    With compact, the tallies are a vector of counts in roster order.
+    """
     try:
-        # Get active session
-        active_session = frappe.db.get_value(
-            "Game Session",
-            {"status": "Active"},
-            ["name", "session_name", "current_question"],
-            as_dict=True,
-        )
+        snapshot = session_cache.get_snapshot(session)
 
-        if not active_session:
+        if not snapshot:
             return {"success": False, "message": "No active session found"}
 
+        active_session = snapshot.session
         if not active_session.current_question:
             return {"success": False, "message": "No active question in session"}
 
-        # Get question details
-        question_data = frappe.db.get_value(
-            "Game Question",
-            active_session.current_question,
-            ["name", "question_text"],
-            as_dict=True,
-        )
+        question_timer.close_if_due(snapshot)
 
-        # Get vote counts for each participant in this session
-        vote_counts = frappe.db.sql(
-            """
-			SELECT
-				sp.name,
-				sp.participant_name,
-				sp.team,
-				COUNT(gv.name) as vote_count
-			FROM `tabSession Participant` sp
-			LEFT JOIN `tabGame Vote` gv ON sp.name = gv.participant
-				AND gv.session = %s AND gv.question = %s
-			WHERE sp.session = %s
-			GROUP BY sp.name, sp.participant_name, sp.team
-			ORDER BY sp.display_order ASC, sp.participant_name ASC
-		""",
-            (active_session.name, active_session.current_question, active_session.name),
-            as_dict=True,
-        )
+        # A closed question reads its frozen result rows, an open one the Redis tally
+        counts = None
+        if snapshot.question_completed:
+            counts = result_snapshots.get_frozen_counts(
+                active_session.name, active_session.current_question
+            )
+        if counts is None:
+            counts = tally.get_counts(
+                active_session.name, active_session.current_question
+            )
+
+        if cint(compact):
+            vector = roster.get_vector(snapshot, counts)
+            return {
+                "success": True,
+                "session": active_session,
+                "question": snapshot.question,
+                **roster.get_roster(snapshot, roster_version),
+                "counts": vector,
+                "total_votes": sum(vector),
+            }
+
+        vote_counts = [
+            frappe._dict(participant, vote_count=counts.get(participant.name, 0))
+            for participant in snapshot.participants
+        ]
 
         # Calculate total votes
         total_votes = sum(row.vote_count for row in vote_counts)
@@ -238,7 +347,7 @@ def get_results():
         return {
             "success": True,
             "session": active_session,
-            "question": question_data,
+            "question": snapshot.question,
             "results": vote_counts,
             "total_votes": total_votes,
         }
@@ -249,6 +358,7 @@ def get_results():
 
 
 @frappe.whitelist(allow_guest=True)
+@instrumentation.instrument
 def activate_session_question(session_id, question_id):
     """Admin method to activate a question in a session with timer"""
     try:
@@ -272,8 +382,8 @@ def activate_session_question(session_id, question_id):
         settings = frappe.get_single("Game Settings")
         timer_seconds = settings.voting_timer_seconds or 30
 
-        # Activate question with timer
-        result = session_doc.activate_question(question_id, timer_seconds)
+        # Activate question with timer; the question timer closes it at the deadline
+        result = question_timer.start_question(session_doc, question_id, timer_seconds)
 
         return {
             "success": True,
@@ -292,6 +402,7 @@ def activate_session_question(session_id, question_id):
 
 
 @frappe.whitelist(allow_guest=True)
+@instrumentation.instrument
 def reset_session_votes(session_id, question_id=None):
     """Reset votes for a session - either specific question or all questions"""
     try:
@@ -299,17 +410,31 @@ def reset_session_votes(session_id, question_id=None):
         if not frappe.db.exists("Game Session", session_id):
             return {"success": False, "message": "Session not found"}
 
+        # Deleted in short chunked transactions so other sessions keep voting
+        teardown.delete_votes(session_id, question_id)
+
         if question_id:
-            # Reset votes for specific question in session
-            frappe.db.delete(
-                "Game Vote", {"session": session_id, "question": question_id}
+            # The question can be played again
+            frappe.db.set_value(
+                "Session Question",
+                {"session": session_id, "question": question_id},
+                "is_completed",
+                0,
             )
             message = f"Votes reset for question in session"
         else:
-            # Reset all votes for session
-            frappe.db.delete("Game Vote", {"session": session_id})
+            frappe.db.sql(
+                "UPDATE `tabSession Question` SET is_completed = 0 WHERE session = %s",
+                (session_id,),
+            )
             message = "All votes have been reset for this session"
 
+        result_snapshots.invalidate(session_id, question_id)
+        session_cache.refresh_session_snapshot(session_id)
+
+        tally.enqueue_reconcile(session_id, question_id)
+        vote_claims.clear_claims(session_id, question_id)
+        live.publish(session_id, "votes_reset", question_id=question_id)
         frappe.db.commit()
         return {"success": True, "message": message}
 
@@ -319,31 +444,50 @@ def reset_session_votes(session_id, question_id=None):
 
 
 @frappe.whitelist(allow_guest=True)
-def get_session_list():
-    """Get list of all sessions for admin"""
+@instrumentation.instrument
+def get_session_list(
+    status=None, team_group=None, cursor=None, limit=None, with_counts=0
+):
+    """Get a page of sessions for admin, newest first; pass next_cursor for more"""
     try:
-        sessions = frappe.db.get_all(
-            "Game Session",
-            fields=["name", "session_name", "team_group", "status", "session_date"],
-            order_by="creation DESC",
+        sessions, next_cursor = admin_state.get_session_list(
+            status=status,
+            team_group=team_group,
+            cursor=cursor,
+            limit=limit,
+            with_counts=cint(with_counts),
         )
-        return {"success": True, "sessions": sessions}
+        return {"success": True, "sessions": sessions, "next_cursor": next_cursor}
     except Exception as e:
         frappe.log_error(f"Error in get_session_list: {str(e)}")
         return {"success": False, "message": "Error fetching sessions"}
 
 
 @frappe.whitelist(allow_guest=True)
+@instrumentation.instrument
+def get_admin_state(session_id=None, since_version=None):
+    """Admin console state in one payload; only sections changed since since_version"""
+    try:
+        return {"success": True, **admin_state.get_state(session_id, since_version)}
+    except Exception as e:
+        frappe.log_error(f"Error in get_admin_state: {str(e)}")
+        return {"success": False, "message": "Error fetching admin state"}
+
+
+@frappe.whitelist(allow_guest=True)
+@instrumentation.instrument
 def start_session(session_id):
     """Start a session (set as active)"""
     try:
-        # Deactivate all other sessions
-        frappe.db.sql(
-            "UPDATE `tabGame Session` SET status = 'Completed' WHERE status = 'Active'"
-        )
-
         # Activate this session
-        frappe.db.set_value("Game Session", session_id, "status", "Active")
+        frappe.db.set_value(
+            "Game Session",
+            session_id,
+            {"status": "Active", "started_on": now_datetime()},
+        )
+        session_cache.refresh_session_snapshot(session_id)
+        versioning.bump_version_after_commit(versioning.SESSION_LIST)
+        live.publish(session_id, "session_started")
         frappe.db.commit()
 
         return {"success": True, "message": "Session started successfully"}
@@ -353,25 +497,36 @@ def start_session(session_id):
 
 
 @frappe.whitelist(allow_guest=True)
+@instrumentation.instrument
 def reactivate_session(session_id):
     """Reactivate a completed session by resetting votes and setting it as active"""
     try:
-        # Deactivate all other sessions
-        frappe.db.sql(
-            "UPDATE `tabGame Session` SET status = 'Completed' WHERE status = 'Active'"
-        )
-
         # Reset all votes for this session
-        frappe.db.sql("DELETE FROM `tabGame Vote` WHERE session = %s", [session_id])
+        teardown.delete_votes(session_id)
+        tally.enqueue_reconcile(session_id)
+        vote_claims.clear_claims(session_id)
 
         # Reset question completion status for this session
         frappe.db.sql(
             "UPDATE `tabSession Question` SET is_completed = 0 WHERE session = %s",
             [session_id],
         )
+        result_snapshots.invalidate(session_id)
 
-        # Activate this session
-        frappe.db.set_value("Game Session", session_id, "status", "Active")
+        # Activate this session; a later completion archives the new votes again
+        frappe.db.set_value(
+            "Game Session",
+            session_id,
+            {
+                "status": "Active",
+                "started_on": now_datetime(),
+                "votes_archived_on": None,
+                "archived_votes": 0,
+            },
+        )
+        session_cache.refresh_session_snapshot(session_id)
+        versioning.bump_version_after_commit(versioning.SESSION_LIST)
+        live.publish(session_id, "session_started")
         frappe.db.commit()
 
         return {"success": True, "message": "Session reactivated successfully"}
@@ -381,60 +536,61 @@ def reactivate_session(session_id):
 
 
 @frappe.whitelist(allow_guest=True)
+@instrumentation.instrument
+def end_session(session_id):
+    """Mark a session Completed; its votes are then archived in the background"""
+    try:
+        session_doc = frappe.get_doc("Game Session", session_id)
+        if session_doc.status != "Active":
+            return {"success": False, "message": "Session is not active"}
+
+        session_doc.status = "Completed"
+        session_doc.save()
+
+        live.publish(session_id, "session_ended")
+        frappe.db.commit()
+
+        return {"success": True, "message": "Session ended successfully"}
+    except Exception as e:
+        frappe.log_error(f"Error in end_session: {str(e)}")
+        return {"success": False, "message": "Error ending session"}
+
+
+@frappe.whitelist(allow_guest=True)
+@instrumentation.instrument
+@versioning.conditional(_session_etag)
 def get_cumulative_results(session_id=None):
     """Returns cumulative vote tallies for a session or active session"""
     try:
-        # If no session specified, get active session
+        # Accepts a session name or join code; defaults to the active session
+        requested = session_id
+        session_id = session_cache.resolve_session_id(session_id)
         if not session_id:
-            session_id = frappe.db.get_value(
-                "Game Session", {"status": "Active"}, "name"
-            )
-            if not session_id:
-                return {"success": False, "message": "No active session found"}
+            message = "Session not found" if requested else "No active session found"
+            return {"success": False, "message": message}
 
-        # Get session details
-        session_data = frappe.db.get_value(
-            "Game Session",
-            session_id,
-            ["name", "session_name", "team_group"],
-            as_dict=True,
-        )
-
-        # Get cumulative vote counts for each participant in this session
-        cumulative_counts = frappe.db.sql(
-            """
-			SELECT
-				sp.name,
-				sp.participant_name,
-				sp.team,
-				COUNT(gv.name) as total_votes
-			FROM `tabSession Participant` sp
-			LEFT JOIN `tabGame Vote` gv ON sp.name = gv.participant AND gv.session = %s
-			WHERE sp.session = %s
-			GROUP BY sp.name, sp.participant_name, sp.team
-			ORDER BY total_votes DESC, sp.participant_name ASC
-		""",
-            (session_id, session_id),
-            as_dict=True,
-        )
+        snapshot = session_cache.get_session_snapshot(session_id)
+        if not snapshot:
+            return {"success": False, "message": "Session not found"}
 
-        # Get total votes for this session
-        total_votes = sum(row.total_votes for row in cumulative_counts)
+        session = snapshot.session
+        session_data = {
+            "name": session.name,
+            "session_name": session.session_name,
+            "team_group": session.team_group,
+        }
 
-        # Get total number of questions that have been voted on in this session
-        questions_with_votes = frappe.db.sql(
-            """
-			SELECT COUNT(DISTINCT question) as question_count
-			FROM `tabGame Vote`
-			WHERE session = %s
-		""",
-            (session_id,),
-            as_dict=True,
-        )
+        # Cumulative counts come from the incrementally maintained leaderboard
+        scores, questions_count = leaderboard.get_standings(session_id)
 
-        questions_count = (
-            questions_with_votes[0].question_count if questions_with_votes else 0
+        cumulative_counts = sorted(
+            (
+                frappe._dict(participant, total_votes=scores.get(participant.name, 0))
+                for participant in snapshot.participants
+            ),
+            key=lambda row: (-row.total_votes, row.participant_name),
         )
+        total_votes = sum(row.total_votes for row in cumulative_counts)
 
         return {
             "success": True,
@@ -453,32 +609,23 @@ def get_cumulative_results(session_id=None):
 
 
 @frappe.whitelist(allow_guest=True)
-def check_vote_status():
-    """Check if current IP has already voted for active session's current question"""
+@instrumentation.instrument
+def check_vote_status(session=None):
+    """Check if this voter has already voted for a session's current question"""
     try:
-        # Get active session
-        active_session = frappe.db.get_value(
-            "Game Session",
-            {"status": "Active"},
-            ["name", "current_question"],
-            as_dict=True,
-        )
+        snapshot = session_cache.get_snapshot(session)
 
-        if not active_session or not active_session.current_question:
+        if not snapshot or not snapshot.session.current_question:
             return {"success": True, "has_voted": False}
 
-        voter_ip = frappe.local.request_ip or "unknown"
-        user_agent = frappe.get_request_header("User-Agent") or "unknown"
-        voter_identifier = f"{voter_ip}_{hash(user_agent) % 10000}"
+        active_session = snapshot.session
 
-        existing_vote = frappe.db.get_value(
-            "Game Vote",
-            {
-                "session": active_session.name,
-                "question": active_session.current_question,
-                "voter_ip": voter_identifier,
-            },
-            ["participant"],
+        # The claim also covers fast path votes that are not written yet
+        existing_vote = vote_claims.get_vote(
+            active_session.name,
+            active_session.current_question,
+            vote_claims.get_voter_identifier(),
+            vote_claims.get_claim_ttl(snapshot),
         )
 
         if existing_vote:
@@ -499,21 +646,12 @@ def check_vote_status():
 
 
 @frappe.whitelist(allow_guest=True)
+@instrumentation.instrument
+@versioning.conditional(_session_etag)
 def get_session_questions(session_id):
     """Get questions assigned to a session"""
     try:
-        questions = frappe.db.sql(
-            """
-            SELECT sq.name, sq.question_order, sq.is_completed,
-                   gq.name as question_id, gq.question_text
-            FROM `tabSession Question` sq
-            JOIN `tabGame Question` gq ON sq.question = gq.name
-            WHERE sq.session = %s
-            ORDER BY sq.question_order ASC
-        """,
-            (session_id,),
-            as_dict=True,
-        )
+        questions = admin_state.get_session_questions(session_id)
 
         return {"success": True, "questions": questions}
     except Exception as e:
@@ -522,15 +660,18 @@ def get_session_questions(session_id):
 
 
 @frappe.whitelist(allow_guest=True)
-def get_session_participants(session_id):
-    """Get participants in a session"""
+@instrumentation.instrument
+def get_session_participants(session_id, compact=0, roster_version=None):
+    """Get participants in a session, or with compact its roster"""
     try:
-        participants = frappe.db.get_all(
-            "Session Participant",
-            filters={"session": session_id},
-            fields=["name", "participant_name", "team", "display_order"],
-            order_by="display_order ASC, participant_name ASC",
-        )
+        if cint(compact):
+            snapshot = session_cache.get_session_snapshot(session_id)
+            if not snapshot:
+                return {"success": False, "message": "Session not found"}
+
+            return {"success": True, **roster.get_roster(snapshot, roster_version)}
+
+        participants = admin_state.get_session_participants(session_id)
 
         return {"success": True, "participants": participants}
     except Exception as e:
@@ -539,108 +680,124 @@ def get_session_participants(session_id):
 
 
 @frappe.whitelist(allow_guest=True)
-def create_session(session_name, team_group, description, questions, participants):
-    """Create a new game session with questions and participants"""
-    try:
-        # Create the session
-        session_doc = frappe.get_doc(
-            {
-                "doctype": "Game Session",
-                "session_name": session_name,
-                "team_group": team_group,
-                "description": description,
-                "status": "Draft",
-            }
-        )
-        session_doc.insert(ignore_permissions=True)
-
-        # Add questions to session
-        # First, get questions from JSON settings to create actual Game Question records if needed
-        import json
-
-        settings = frappe.get_single("Game Settings")
-        questions_json = settings.get("questions_json", "[]")
-        available_questions = json.loads(questions_json) if questions_json else []
-
-        for i, question_id in enumerate(questions):
-            # Find the question in JSON
-            question_data = next(
-                (q for q in available_questions if q["name"] == question_id), None
-            )
+@instrumentation.instrument
+def create_session(
+    session_name,
+    team_group,
+    description,
+    questions,
+    participants,
+    request_key=None,
+    background=False,
+):
+    """Create a new game session with questions and participants
+
+    With a request key, repeating the call returns the first call's outcome
+    instead of creating another session. With background, the session is
+    created by a worker and the job state is returned right away.
+    """
+    session = {
+        "session_name": session_name,
+        "team_group": team_group,
+        "description": description,
+        "questions": frappe.parse_json(questions),
+        "participants": frappe.parse_json(participants),
+    }
 
-            if question_data:
-                # Create or get Game Question record
-                if not frappe.db.exists("Game Question", question_id):
-                    game_question = frappe.get_doc(
-                        {
-                            "doctype": "Game Question",
-                            "name": question_id,
-                            "question_text": question_data["question_text"],
-                            "is_active": 1,
-                            "for_leadership_track": question_data.get(
-                                "for_leadership_track", 0
-                            ),
-                            "for_backend_track": question_data.get(
-                                "for_backend_track", 0
-                            ),
-                            "for_frontend_track": question_data.get(
-                                "for_frontend_track", 0
-                            ),
-                            "for_custom_sessions": question_data.get(
-                                "for_custom_sessions", 0
-                            ),
-                        }
-                    )
-                    game_question.insert(ignore_permissions=True)
-
-                # Create Session Question
-                session_question = frappe.get_doc(
-                    {
-                        "doctype": "Session Question",
-                        "session": session_doc.name,
-                        "question": question_id,
-                        "question_order": i + 1,
-                    }
-                )
-                session_question.insert(ignore_permissions=True)
+    try:
+        if request_key:
+            session_jobs.validate_request_key(request_key)
+        elif cint(background):
+            request_key = frappe.generate_hash(length=20)
+
+        if cint(background):
+            job = session_jobs.enqueue_create_session(request_key, **session)
+            return {"success": job["status"] != "failed", **_session_job_reply(job)}
+
+        if request_key:
+            job = session_jobs.claim(request_key)
+            if job:
+                return {"success": job["status"] != "failed", **_session_job_reply(job)}
+
+        # Sessions, missing Game Questions and all child rows go in as bulk inserts
+        session_id = bulk_create.create_session(**session)
+        frappe.db.commit()
 
-        # Add participants to session
-        for i, participant in enumerate(participants):
-            session_participant = frappe.get_doc(
-                {
-                    "doctype": "Session Participant",
-                    "session": session_doc.name,
-                    "participant_name": participant["name"],
-                    "team": participant["team"],
-                    "display_order": i + 1,
-                }
+        if request_key:
+            session_jobs.update_job(
+                request_key, publish=False, status="done", session_id=session_id
             )
-            session_participant.insert(ignore_permissions=True)
-
-        frappe.db.commit()
 
         return {
             "success": True,
             "message": "Session created successfully",
-            "session_id": session_doc.name,
+            "session_id": session_id,
         }
 
     except Exception as e:
+        frappe.db.rollback()
         frappe.log_error(f"Error in create_session: {str(e)}")
-        return {"success": False, "message": f"Error creating session: {str(e)}"}
+        message = f"Error creating session: {str(e)}"
+        if request_key and session_jobs.get_job(request_key):
+            session_jobs.update_job(
+                request_key, publish=False, status="failed", message=message
+            )
+        return {"success": False, "message": message}
+
+
+def _session_job_reply(job):
+    """create_session / get_session_job reply for a (possibly finished) job"""
+    messages = {
+        "queued": "Session creation queued",
+        "running": "Session is being created",
+        "done": "Session created successfully",
+    }
+    return {
+        "message": job.get("message") or messages.get(job["status"]),
+        "status": job["status"],
+        "progress": job.get("progress", 0),
+        "request_key": job["request_key"],
+        "job_id": job.get("job_id"),
+        "session_id": job.get("session_id"),
+    }
+
+
+@frappe.whitelist(allow_guest=True)
+@instrumentation.instrument
+def get_session_job(request_key):
+    """State of a create_session request, for pages without the live channel"""
+    try:
+        job = session_jobs.get_job(request_key)
+        if not job:
+            return {"success": False, "message": "Unknown session request"}
+
+        return {"success": job["status"] != "failed", **_session_job_reply(job)}
+
+    except Exception as e:
+        frappe.log_error(f"Error in get_session_job: {str(e)}")
+        return {"success": False, "message": "Failed to get session request"}
 
 
 @frappe.whitelist(allow_guest=True)
+@instrumentation.instrument
 def import_questions_from_json(questions_json):
     """Import questions from JSON string"""
     try:
         from fun_and_games.import_questions import import_from_json_string
 
-        # Parse and import questions
-        success = import_from_json_string(questions_json)
+        # Stream, dedup and bulk insert the questions
+        stats = import_from_json_string(questions_json)
 
-        if success:
-            return {"success": True, "message": "Questions imported successfully!"}
+        if stats:
+            return {
+                "success": True,
+                "message": (
+                    f"Imported {stats['imported']} questions "
+                    f"({stats['duplicates']} duplicates and {stats['invalid']} "
+                    "invalid entries skipped)"
+                ),
+                "stats": stats,
+            }
         else:
             return {
                 "success": False,
@@ -653,19 +810,14 @@ def import_questions_from_json(questions_json):
 
 
 @frappe.whitelist(allow_guest=True)
+@instrumentation.instrument
 def clear_expired_question(session_id):
-    """Clear expired question from session"""
+    """Close the session's current question once its time and grace period are up"""
     try:
-        session_doc = frappe.get_doc("Game Session", session_id)
-
-        # Check if voting has expired
-        if session_doc.voting_deadline and now_datetime() > session_doc.voting_deadline:
-            session_doc.current_question = None
-            session_doc.question_start_time = None
-            session_doc.voting_deadline = None
-            session_doc.save()
-
-            return {"success": True, "message": "Expired question cleared"}
+        # Same close as the timer: completes the question and freezes its results
+        if question_timer.close_question(session_id):
+            frappe.db.commit()
+            return {"success": True, "message": "Expired question closed"}
 
         return {"success": False, "message": "Question has not expired yet"}
 
@@ -675,11 +827,19 @@ def clear_expired_question(session_id):
 
 
 @frappe.whitelist(allow_guest=True)
+@instrumentation.instrument
 def reset_entire_session(session_id):
     """Reset entire session - clear all votes and current question"""
     try:
         # Delete all votes for this session
-        frappe.db.sql("DELETE FROM `tabGame Vote` WHERE session = %s", (session_id,))
+        teardown.delete_votes(session_id)
+        tally.enqueue_reconcile(session_id)
+        vote_claims.clear_claims(session_id)
+        frappe.db.sql(
+            "UPDATE `tabSession Question` SET is_completed = 0 WHERE session = %s",
+            (session_id,),
+        )
+        result_snapshots.invalidate(session_id)
 
         # Reset session state
         session_doc = frappe.get_doc("Game Session", session_id)
@@ -688,6 +848,7 @@ def reset_entire_session(session_id):
         session_doc.voting_deadline = None
         session_doc.save()
 
+        live.publish(session_id, "session_reset")
         frappe.db.commit()
 
         return {"success": True, "message": "Session reset successfully"}
@@ -698,31 +859,51 @@ def reset_entire_session(session_id):
 
 
 @frappe.whitelist(allow_guest=True)
+@instrumentation.instrument
 def update_session_participants(session_id, participants):
     """Update participants for a session"""
     try:
-        # Delete existing participants
-        frappe.db.sql(
-            "DELETE FROM `tabSession Participant` WHERE session = %s", (session_id,)
-        )
+        # Applied as a diff, so unchanged participants keep their rows and votes
+        participants = frappe.parse_json(participants)
+        changes = roster.update_participants(session_id, participants)
 
-        # Add new participants
-        for i, participant in enumerate(participants):
-            session_participant = frappe.get_doc(
-                {
-                    "doctype": "Session Participant",
-                    "session": session_id,
-                    "participant_name": participant["name"],
-                    "team": participant["team"],
-                    "display_order": i + 1,
-                }
-            )
-            session_participant.insert(ignore_permissions=True)
+        if changes["removed_votes"]:
+            # Counters, claims and ranks still include the removed participants' votes
+            tally.enqueue_reconcile(session_id)
+            vote_claims.clear_claims(session_id)
 
+        session_cache.refresh_session_snapshot(session_id)
+        live.publish(session_id, "participants_updated")
         frappe.db.commit()
 
-        return {"success": True, "message": "Participants updated successfully"}
+        return {
+            "success": True,
+            "message": "Participants updated successfully",
+            "changes": changes,
+        }
 
     except Exception as e:
+        frappe.db.rollback()
         frappe.log_error(f"Error in update_session_participants: {str(e)}")
         return {"success": False, "message": "Failed to update participants"}
+
+
+@frappe.whitelist()
+def get_api_metrics(minutes=None):
+    """Rolling per-endpoint latency, query and cache stats for the admin panel"""
+    frappe.only_for("System Manager")
+
+    try:
+        minutes = min(
+            int(minutes or instrumentation.WINDOW_MINUTES),
+            instrumentation.WINDOW_MINUTES,
+        )
+        return {
+            "success": True,
+            "enabled": instrumentation.is_enabled(),
+            "minutes": minutes,
+            "metrics": instrumentation.get_metrics(minutes),
+        }
+    except Exception as e:
+        frappe.log_error(f"Error getting API metrics: {str(e)}")
+        return {"success": False, "message": str(e)}
@@ -0,0 +1,248 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+"""
+Batch creation of game sessions.
+
+Sessions, their Session Question / Session Participant rows and any Game
+Question missing from the database are written with one bulk insert per
+doctype, instead of one document insert per row. Used by the create_session
+API and the session creation scripts.
+"""
+
+import frappe
+from frappe.model.naming import parse_naming_series
+from frappe.utils import cint, now_datetime, today
+
+from fun_and_games.fun_and_games import question_catalog, versioning
+from fun_and_games.fun_and_games.doctype.game_session.game_session import (
+    generate_join_code,
+)
+
+STANDARD_FIELDS = ["name", "creation", "modified", "owner", "modified_by"]
+
+SESSION_FIELDS = STANDARD_FIELDS + [
+    "naming_series",
+    "session_name",
+    "join_code",
+    "team_group",
+    "session_date",
+    "status",
+    "description",
+]
+QUESTION_FIELDS = STANDARD_FIELDS + [
+    "naming_series",
+    "question_text",
+    "category",
+    "is_active",
+    "for_leadership_track",
+    "for_backend_track",
+    "for_frontend_track",
+    "for_custom_sessions",
+]
+SESSION_QUESTION_FIELDS = STANDARD_FIELDS + [
+    "naming_series",
+    "session",
+    "question",
+    "question_order",
+    "is_completed",
+]
+SESSION_PARTICIPANT_FIELDS = STANDARD_FIELDS + [
+    "naming_series",
+    "session",
+    "participant_name",
+    "team",
+    "display_order",
+]
+
+
+def get_naming_series(doctype):
+    """Default naming series of a doctype, e.g. SP-.YYYY.-"""
+    return frappe.get_meta(doctype).get_field("naming_series").options.split("\n")[0]
+
+
+def reserve_names(doctype, count):
+    """Reserve `count` consecutive names from the doctype's naming series"""
+    if not count:
+        return []
+
+    prefix = parse_naming_series(get_naming_series(doctype))
+
+    # Lock the counter row so concurrent creators get disjoint blocks
+    current = frappe.db.sql(
+        "SELECT `current` FROM `tabSeries` WHERE `name` = %s FOR UPDATE", (prefix,)
+    )
+    if current:
+        start = cint(current[0][0])
+        frappe.db.sql(
+            "UPDATE `tabSeries` SET `current` = %s WHERE `name` = %s",
+            (start + count, prefix),
+        )
+    else:
+        start = 0
+        frappe.db.sql(
+            "INSERT INTO `tabSeries` (`name`, `current`) VALUES (%s, %s)",
+            (prefix, count),
+        )
+
+    # Same format as the "naming_series:" autoname, which appends ".#####"
+    return [f"{prefix}{number:05d}" for number in range(start + 1, start + 1 + count)]
+
+
+def create_session(
+    session_name,
+    team_group,
+    description,
+    questions,
+    participants,
+    catalog=None,
+    progress=None,
+):
+    """Create one session; see create_sessions. Returns the new Game Session name"""
+    return create_sessions(
+        [
+            {
+                "session_name": session_name,
+                "team_group": team_group,
+                "description": description,
+                "questions": questions,
+                "participants": participants,
+            }
+        ],
+        catalog=catalog,
+        progress=progress,
+    )[0]
+
+
+def create_sessions(sessions, catalog=None, progress=None):
+    """Insert sessions with their questions and participants in the current transaction
+
+    Each session is a dict with session_name, team_group, description,
+    questions (Game Question names, in play order) and participants
+    ({"name" or "participant_name", "team"}, in display order). Question names
+    that are not in the database are created from `catalog` (defaults to the
+    Game Settings questions); names found in neither are skipped.
+    `progress(doctype, rows)` is called after each doctype is inserted.
+
+    Returns the new Game Session names in the same order.
+    """
+    if catalog is None:
+        catalog = question_catalog.get_catalog().by_id
+
+    now = now_datetime()
+    user = frappe.session.user
+    standard_values = (now, now, user, user)
+
+    available = _ensure_questions(sessions, catalog, standard_values)
+    if progress:
+        progress("Game Question", len(available))
+
+    session_names = reserve_names("Game Session", len(sessions))
+    session_series = get_naming_series("Game Session")
+    session_questions = []
+    session_participants = []
+    session_rows = []
+
+    for session_name, session in zip(session_names, sessions):
+        session_rows.append(
+            (
+                session_name,
+                *standard_values,
+                session_series,
+                session["session_name"],
+                generate_join_code(),
+                session["team_group"],
+                today(),
+                "Draft",
+                session.get("description"),
+            )
+        )
+
+        question_ids = [q for q in session["questions"] if q in available]
+        session_questions.extend(
+            (session_name, question_id, order)
+            for order, question_id in enumerate(question_ids, start=1)
+        )
+        session_participants.extend(
+            (
+                session_name,
+                participant.get("participant_name") or participant.get("name"),
+                participant["team"],
+                order,
+            )
+            for order, participant in enumerate(session["participants"], start=1)
+        )
+
+    frappe.db.bulk_insert("Game Session", SESSION_FIELDS, session_rows)
+    versioning.bump_version_after_commit(versioning.SESSION_LIST)
+    if progress:
+        progress("Game Session", len(session_rows))
+
+    question_series = get_naming_series("Session Question")
+    frappe.db.bulk_insert(
+        "Session Question",
+        SESSION_QUESTION_FIELDS,
+        [
+            (name, *standard_values, question_series, *row, 0)
+            for name, row in zip(
+                reserve_names("Session Question", len(session_questions)),
+                session_questions,
+            )
+        ],
+    )
+    if progress:
+        progress("Session Question", len(session_questions))
+
+    participant_series = get_naming_series("Session Participant")
+    frappe.db.bulk_insert(
+        "Session Participant",
+        SESSION_PARTICIPANT_FIELDS,
+        [
+            (name, *standard_values, participant_series, *row)
+            for name, row in zip(
+                reserve_names("Session Participant", len(session_participants)),
+                session_participants,
+            )
+        ],
+    )
+    if progress:
+        progress("Session Participant", len(session_participants))
+
+    return session_names
+
+
+def _ensure_questions(sessions, catalog, standard_values):
+    """Create catalog questions missing from the database; returns the usable names"""
+    wanted = list(
+        dict.fromkeys(q for session in sessions for q in session["questions"])
+    )
+    if not wanted:
+        return set()
+
+    existing = set(
+        frappe.get_all("Game Question", filters={"name": ("in", wanted)}, pluck="name")
+    )
+    missing = [q for q in wanted if q not in existing and q in catalog]
+
+    question_series = get_naming_series("Game Question")
+    frappe.db.bulk_insert(
+        "Game Question",
+        QUESTION_FIELDS,
+        [
+            (
+                question_id,
+                *standard_values,
+                question_series,
+                catalog[question_id]["question_text"],
+                catalog[question_id].get("category"),
+                1,
+                catalog[question_id].get("for_leadership_track", 0),
+                catalog[question_id].get("for_backend_track", 0),
+                catalog[question_id].get("for_frontend_track", 0),
+                catalog[question_id].get("for_custom_sessions", 0),
+            )
+            for question_id in missing
+        ],
+    )
+
+    return existing | set(missing)
@@ -4,6 +4,8 @@
 import frappe
 from frappe.model.document import Document
 
+from fun_and_games.fun_and_games.session_cache import clear_all_snapshots
+
 
 class GameQuestion(Document):
 	def validate(self):
@@ -16,3 +18,8 @@ class GameQuestion(Document):
 				WHERE name != %s AND is_active = 1
 			""", (self.name,))
 			frappe.db.commit()
+
+	def on_update(self):
+		# Snapshots embed the current question's text; a new question can't be current yet
+		if not self.flags.in_insert:
+			clear_all_snapshots()
@@ -1,9 +1,42 @@
 # Copyright (c) 2025, Amirah Michelle and Contributors
 # See license.txt
 
-# import frappe
+import io
+import json
+from unittest.mock import patch
+
 from frappe.tests.utils import FrappeTestCase
 
+from fun_and_games import import_questions
+
+
+def read_json_array(text, chunk_size=import_questions.READ_CHUNK_SIZE):
+	with patch.object(import_questions, "READ_CHUNK_SIZE", chunk_size):
+		return list(import_questions._iter_json_array(io.StringIO(text)))
+
 
 class TestGameQuestion(FrappeTestCase):
-	pass
+	def test_iter_json_array_across_chunks(self):
+		questions = [
+			{"question_text": f"Who is most likely to [{i}], {{really}}?", "is_active": i % 2}
+			for i in range(20)
+		]
+		text = json.dumps(questions, indent=2)
+
+		# Items, strings with brackets and separators all straddle chunk boundaries
+		for chunk_size in (1, 3, 7, 64, len(text)):
+			self.assertEqual(read_json_array(text, chunk_size), questions)
+
+	def test_iter_json_array_empty(self):
+		self.assertEqual(read_json_array("  [ ]  ", chunk_size=1), [])
+
+	def test_iter_json_array_rejects_non_array(self):
+		with self.assertRaises(ValueError):
+			read_json_array('{"question_text": "Not a list"}')
+
+	def test_iter_json_array_rejects_truncated_input(self):
+		with self.assertRaises(ValueError):
+			read_json_array('[{"question_text": "Cut off"},', chunk_size=4)
+
+		with self.assertRaises(ValueError):
+			read_json_array('[{"question_text": "Cut', chunk_size=4)
@@ -1,22 +1,58 @@
 # Copyright (c) 2025, Fun and Games and contributors
 # For license information, please see license.txt
 
+import secrets
+
 import frappe
 from frappe.model.document import Document
 from datetime import datetime, timedelta
 
+from fun_and_games.fun_and_games.leaderboard import enqueue_persist
+from fun_and_games.fun_and_games.session_cache import (
+	clear_session_lookup,
+	clear_session_snapshot,
+	refresh_session_snapshot,
+)
+from fun_and_games.fun_and_games.versioning import SESSION_LIST, bump_version_after_commit
+
+# No 0/O or 1/I so codes can be read off a projector
+JOIN_CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+JOIN_CODE_LENGTH = 6
+
+
+def generate_join_code():
+	return "".join(secrets.choice(JOIN_CODE_ALPHABET) for _ in range(JOIN_CODE_LENGTH))
+
 
 class GameSession(Document):
+	def before_insert(self):
+		if not self.join_code:
+			self.join_code = generate_join_code()
+
 	def validate(self):
-		# Ensure only one session is active at a time
-		if self.status == "Active":
-			# Deactivate all other sessions
-			frappe.db.sql("""
-				UPDATE `tabGame Session` 
-				SET status = 'Completed' 
-				WHERE name != %s AND status = 'Active'
-			""", (self.name,))
-			frappe.db.commit()
+		if self.status == "Active" and self.has_value_changed("status"):
+			from frappe.utils import now_datetime
+
+			self.started_on = now_datetime()
+
+	def on_update(self):
+		refresh_session_snapshot(self.name)
+		bump_version_after_commit(SESSION_LIST)
+
+		# The previous question just closed; store the standings it left behind
+		previous = self.get_doc_before_save()
+		if previous and previous.current_question and self.has_value_changed("current_question"):
+			enqueue_persist(self.name)
+
+		if self.status == "Completed" and self.has_value_changed("status"):
+			from fun_and_games.fun_and_games.vote_archive import enqueue_archive
+
+			enqueue_archive(self.name)
+
+	def on_trash(self):
+		clear_session_snapshot(self.name)
+		clear_session_lookup(self.name, self.join_code)
+		bump_version_after_commit(SESSION_LIST)
 	
 	def activate_question(self, question_id, timer_seconds=30):
 		"""Activate a question for this session with timer"""
@@ -50,3 +86,8 @@ class GameSession(Document):
 		from frappe.utils import now_datetime
 		remaining = self.voting_deadline - now_datetime()
 		return max(0, int(remaining.total_seconds()))
+
+
+def on_doctype_update():
+	# Backs the session list: filter by status, newest first
+	frappe.db.add_index("Game Session", ["status", "creation"], index_name="status_creation")
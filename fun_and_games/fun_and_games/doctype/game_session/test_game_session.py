@@ -0,0 +1,251 @@
+# Copyright (c) 2025, Amirah Michelle and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_to_date, now_datetime
+
+from werkzeug.test import EnvironBuilder
+
+from fun_and_games.fun_and_games import api, bulk_create, session_jobs, versioning, voter_token
+from fun_and_games.fun_and_games.admin_state import get_session_list
+from fun_and_games.fun_and_games.teardown import delete_sessions
+
+
+def make_session(participants=("Alice", "Bob"), questions=1, **values):
+	"""Commit an Active session on its first question, with questions and participants.
+
+	Committed because the paths under test commit and roll back themselves;
+	remove it again with delete_session.
+	"""
+	question_names = [
+		frappe.get_doc(
+			{
+				"doctype": "Game Question",
+				"question_text": f"Who is most likely to pass test {frappe.generate_hash(length=8)}?",
+			}
+		)
+		.insert()
+		.name
+		for _ in range(questions)
+	]
+
+	now = now_datetime()
+	session = frappe.get_doc(
+		{
+			"doctype": "Game Session",
+			"session_name": f"Test Session {frappe.generate_hash(length=6)}",
+			"team_group": "Custom",
+			"status": "Active",
+			"current_question": question_names[0],
+			"question_start_time": now,
+			"voting_deadline": add_to_date(now, seconds=60),
+			**values,
+		}
+	).insert()
+
+	for order, question in enumerate(question_names, start=1):
+		frappe.get_doc(
+			{
+				"doctype": "Session Question",
+				"session": session.name,
+				"question": question,
+				"question_order": order,
+			}
+		).insert()
+
+	participant_names = [
+		frappe.get_doc(
+			{
+				"doctype": "Session Participant",
+				"session": session.name,
+				"participant_name": participant_name,
+				"team": "QA",
+				"display_order": order,
+			}
+		)
+		.insert()
+		.name
+		for order, participant_name in enumerate(participants, start=1)
+	]
+	frappe.db.commit()
+
+	return frappe._dict(name=session.name, questions=question_names, participants=participant_names)
+
+
+def delete_session(session):
+	delete_sessions([session.name])
+	for question in session.questions:
+		frappe.delete_doc("Game Question", question, force=True)
+	frappe.db.commit()
+
+
+class TestGameSession(FrappeTestCase):
+	def setUp(self):
+		now = now_datetime()
+		# Two sessions share a creation time, so pages must break the tie by name
+		creations = [add_to_date(now, days=1), add_to_date(now, days=1), now, add_to_date(now, days=-1)]
+
+		self.sessions = []
+		for index, creation in enumerate(creations):
+			session = frappe.get_doc(
+				{
+					"doctype": "Game Session",
+					"session_name": f"Cursor Test {index}",
+					"team_group": "Custom",
+					"status": "Draft",
+				}
+			).insert()
+			frappe.db.set_value("Game Session", session.name, "creation", creation, update_modified=False)
+			self.sessions.append(session.name)
+
+	def get_all_pages(self, limit):
+		names = []
+		cursor = None
+		while True:
+			sessions, cursor = get_session_list(team_group="Custom", cursor=cursor, limit=limit)
+			self.assertLessEqual(len(sessions), limit)
+			names.extend(session.name for session in sessions)
+			if not cursor:
+				return names
+
+	def test_session_list_cursor_pages(self):
+		expected = frappe.get_all(
+			"Game Session",
+			filters={"team_group": "Custom"},
+			order_by="creation DESC, name DESC",
+			pluck="name",
+		)
+
+		for limit in (1, 2, 3):
+			names = self.get_all_pages(limit)
+			# Every session exactly once, newest first
+			self.assertEqual(names, expected)
+
+	def test_last_page_has_no_cursor(self):
+		sessions, cursor = get_session_list(team_group="Custom", limit=200)
+
+		self.assertIsNone(cursor)
+		self.assertTrue(set(self.sessions) <= {session.name for session in sessions})
+
+
+class TestConditionalGet(FrappeTestCase):
+	def setUp(self):
+		self.session = make_session()
+		self.previous_request = getattr(frappe.local, "request", None)
+
+	def tearDown(self):
+		frappe.local.request = self.previous_request
+		frappe.form_dict.pop("cmd", None)
+		delete_session(self.session)
+
+	def call(self, method, etag=None, cookie=None):
+		"""Call an endpoint as its HTTP request would"""
+		headers = {}
+		if etag:
+			headers["If-None-Match"] = etag
+		if cookie:
+			headers["Cookie"] = cookie
+		frappe.local.request = EnvironBuilder(headers=headers).get_request()
+		frappe.form_dict.cmd = f"fun_and_games.fun_and_games.api.{method}"
+		return getattr(api, method)(session=self.session.name)
+
+	def test_unchanged_state_is_answered_with_304(self):
+		response = self.call("get_results")
+		self.assertEqual(response.status_code, 200)
+
+		self.assertEqual(self.call("get_results", response.headers["ETag"]).status_code, 304)
+
+	def test_version_bump_serves_the_new_state(self):
+		etag = self.call("get_results").headers["ETag"]
+		versioning.bump_version(self.session.name)
+
+		response = self.call("get_results", etag)
+		self.assertEqual(response.status_code, 200)
+		self.assertNotEqual(response.headers["ETag"], etag)
+
+	def test_voter_without_token_is_never_answered_with_304(self):
+		# Each tokenless call is issued a new voter id, so a cached ETag cannot match
+		etag = self.call("get_active_session").headers["ETag"]
+
+		self.assertEqual(self.call("get_active_session", etag).status_code, 200)
+
+	def test_voter_with_token_is_answered_with_304(self):
+		cookie = f"{voter_token.COOKIE_NAME}={voter_token.make_token('0' * 24)}"
+		etag = self.call("get_active_session", cookie=cookie).headers["ETag"]
+
+		self.assertEqual(self.call("get_active_session", etag, cookie).status_code, 304)
+
+
+class TestBulkCreate(FrappeTestCase):
+	def test_reserve_names_hands_out_disjoint_blocks(self):
+		first = bulk_create.reserve_names("Session Participant", 3)
+		second = bulk_create.reserve_names("Session Participant", 2)
+
+		self.assertEqual(len(first), 3)
+		self.assertEqual(len(second), 2)
+		self.assertEqual(len(set(first) | set(second)), 5)
+		self.assertEqual(bulk_create.reserve_names("Session Participant", 0), [])
+
+	def test_reserved_names_continue_the_naming_series(self):
+		# Documents inserted one by one must never collide with a reserved block
+		reserved = bulk_create.reserve_names("Game Session", 2)
+		name = frappe.get_doc(
+			{"doctype": "Game Session", "session_name": "Test Session", "team_group": "Custom"}
+		).insert().name
+
+		self.assertNotIn(name, reserved)
+		self.assertGreater(name, reserved[-1])
+		self.assertEqual(name[:-5], reserved[-1][:-5])
+		self.assertEqual(int(name[-5:]), int(reserved[-1][-5:]) + 1)
+
+
+class TestSessionJobs(FrappeTestCase):
+	def setUp(self):
+		self.request_key = frappe.generate_hash(length=20)
+		self.session_name = f"Test Session {frappe.generate_hash(length=6)}"
+
+	def tearDown(self):
+		frappe.cache.delete(session_jobs._job_key(self.request_key))
+		delete_sessions(frappe.get_all("Game Session", filters={"session_name": self.session_name}, pluck="name"))
+		frappe.db.commit()
+
+	def create_session(self):
+		return api.create_session(
+			session_name=self.session_name,
+			team_group="Custom",
+			description=None,
+			questions="[]",
+			participants='[{"participant_name": "Alice", "team": "QA"}]',
+			request_key=self.request_key,
+		)
+
+	def test_repeated_request_key_returns_the_first_session(self):
+		first = self.create_session()
+		self.assertTrue(first["success"])
+
+		second = self.create_session()
+		self.assertTrue(second["success"])
+		self.assertEqual(second["status"], "done")
+		self.assertEqual(second["session_id"], first["session_id"])
+		self.assertEqual(frappe.db.count("Game Session", {"session_name": self.session_name}), 1)
+
+	def test_claimed_request_key_returns_the_existing_job(self):
+		self.assertIsNone(session_jobs.claim(self.request_key, "first-job"))
+
+		existing = session_jobs.claim(self.request_key, "second-job")
+		self.assertEqual(existing["job_id"], "first-job")
+		self.assertEqual(existing["status"], "queued")
+
+	def test_progress_is_pushed_to_the_request_room_only(self):
+		session_jobs.claim(self.request_key)
+
+		with patch.object(frappe, "publish_realtime") as publish_realtime:
+			session_jobs.update_job(self.request_key, status="running")
+
+		# A user room would reach every guest setting up a session
+		_, options = publish_realtime.call_args
+		self.assertEqual(options["task_id"], self.request_key)
+		self.assertNotIn("user", options)
@@ -1,9 +1,12 @@
 # Copyright (c) 2025, Fun and Games and contributors
 # For license information, please see license.txt
 
-import frappe
 from frappe.model.document import Document
 
+from fun_and_games.fun_and_games.session_cache import clear_all_snapshots
+
 
 class GameSettings(Document):
-	pass
+	def on_update(self):
+		# Snapshots carry the grace period
+		clear_all_snapshots()
@@ -4,14 +4,33 @@
 import frappe
 from frappe.model.document import Document
 
+from fun_and_games.fun_and_games import session_cache, vote_claims
+
 
 class GameVote(Document):
 	def validate(self):
-		# Check for duplicate votes from same IP for same question
-		existing_vote = frappe.db.exists("Game Vote", {
-			"question": self.question,
-			"voter_ip": self.voter_ip
-		})
-		
-		if existing_vote and existing_vote != self.name:
-			frappe.throw("You have already voted for this question!")
+		# submit_vote has already claimed the vote; other inserts claim it here.
+		# Repeats that get past a lost claim hit the unique key on insert.
+		if not self.is_new() or self.flags.vote_claimed:
+			return
+
+		snapshot = session_cache.get_session_snapshot(self.session)
+		ttl = vote_claims.get_claim_ttl(snapshot) if snapshot else vote_claims.CLAIM_TTL_MARGIN
+		if not vote_claims.claim(self.session, self.question, self.voter_ip, self.participant, ttl):
+			frappe.throw(
+				"You have already voted for this question!", frappe.UniqueValidationError
+			)
+
+
+def on_doctype_update():
+	# One vote per voter per question, and the per-question tally lookup
+	frappe.db.add_unique(
+		"Game Vote",
+		["session", "question", "voter_ip"],
+		constraint_name="unique_session_question_voter",
+	)
+	frappe.db.add_index(
+		"Game Vote",
+		["session", "question", "participant"],
+		index_name="session_question_participant",
+	)
@@ -0,0 +1,374 @@
+# Copyright (c) 2025, Amirah Michelle and Contributors
+# See license.txt
+
+import gzip
+import json
+import os
+import shutil
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils.background_jobs import get_redis_conn
+from werkzeug.test import EnvironBuilder
+
+from fun_and_games.fun_and_games import (
+	api,
+	question_timer,
+	result_snapshots,
+	tally,
+	teardown,
+	vote_archive,
+	vote_claims,
+	vote_queue,
+	voter_token,
+)
+from fun_and_games.fun_and_games.admin_state import _add_counts
+from fun_and_games.fun_and_games.doctype.game_session.test_game_session import (
+	delete_session,
+	make_session,
+)
+
+
+def make_vote(session, participant, voter, question=None):
+	"""Insert a vote the way the admin tools do, claiming it on the way"""
+	return (
+		frappe.get_doc(
+			{
+				"doctype": "Game Vote",
+				"session": session.name,
+				"question": question or session.questions[0],
+				"participant": participant,
+				"voter_ip": voter,
+			}
+		)
+		.insert()
+		.name
+	)
+
+
+def set_fast_vote_ingestion(value):
+	frappe.db.set_single_value("Game Settings", "fast_vote_ingestion", value)
+	frappe.clear_document_cache("Game Settings", "Game Settings")
+
+
+class TestVoterToken(FrappeTestCase):
+	def setUp(self):
+		self.voter_id = "0123456789abcdef01234567"
+
+	def test_verify_round_trip(self):
+		self.assertEqual(voter_token.verify(voter_token.make_token(self.voter_id)), self.voter_id)
+
+	def test_verify_rejects_tampered_tokens(self):
+		token = voter_token.make_token(self.voter_id)
+		other_id = "f" * len(self.voter_id)
+		_, _, signature = token.partition(".")
+
+		self.assertIsNone(voter_token.verify(f"{other_id}.{signature}"))
+		self.assertIsNone(voter_token.verify(token[:-1]))
+		self.assertIsNone(voter_token.verify(self.voter_id))
+
+	def test_verify_rejects_malformed_tokens(self):
+		for token in (None, "", ".", "abc.def", voter_token.make_token("abc")):
+			self.assertIsNone(voter_token.verify(token))
+
+
+class TestGameVote(FrappeTestCase):
+	def setUp(self):
+		# The direct insert path is the one that meets the unique key
+		self.fast_vote_ingestion = frappe.db.get_single_value("Game Settings", "fast_vote_ingestion")
+		set_fast_vote_ingestion(0)
+
+		# submit_vote rolls back on a duplicate, so the fixtures are committed
+		self.session = make_session()
+		self.question = self.session.questions[0]
+		self.participants = self.session.participants
+
+		self.voter_id = "00000000000000000000abcd"
+		self.previous_request = getattr(frappe.local, "request", None)
+
+	def tearDown(self):
+		frappe.local.request = self.previous_request
+		delete_session(self.session)
+		set_fast_vote_ingestion(self.fast_vote_ingestion)
+		frappe.db.commit()
+
+	def submit_vote(self, participant):
+		cookie = f"{voter_token.COOKIE_NAME}={voter_token.make_token(self.voter_id)}"
+		frappe.local.request = EnvironBuilder(headers={"Cookie": cookie}).get_request()
+		return api.submit_vote(participant=participant, session=self.session.name)
+
+	def test_repeat_vote_refused_after_claim_is_lost(self):
+		first = self.submit_vote(self.participants[0])
+		self.assertTrue(first["success"])
+		frappe.db.commit()
+
+		# Redis lost the claim; only the unique key on Game Vote is left
+		vote_claims.release(self.session.name, self.question, self.voter_id)
+
+		second = self.submit_vote(self.participants[1])
+		self.assertFalse(second["success"])
+		self.assertEqual(second["message"], "You have already voted for this question!")
+		self.assertEqual(second["voter_state"]["voted_participant"], self.participants[0])
+
+		# The restored claim names the stored vote, not the refused one
+		self.assertEqual(
+			vote_claims.get_vote(self.session.name, self.question, self.voter_id),
+			self.participants[0],
+		)
+		self.assertEqual(
+			frappe.get_all(
+				"Game Vote",
+				filters={"session": self.session.name, "voter_ip": self.voter_id},
+				pluck="participant",
+			),
+			[self.participants[0]],
+		)
+
+	def test_vote_without_token_is_refused(self):
+		frappe.local.request = EnvironBuilder().get_request()
+		response = api.submit_vote(participant=self.participants[0], session=self.session.name)
+
+		self.assertFalse(response["success"])
+		self.assertEqual(response["message"], "Please reload the page before voting")
+		self.assertFalse(frappe.db.exists("Game Vote", {"session": self.session.name}))
+
+
+class TestTally(FrappeTestCase):
+	def setUp(self):
+		self.session = make_session()
+		self.question = self.session.questions[0]
+		self.alice, self.bob = self.session.participants
+
+	def tearDown(self):
+		delete_session(self.session)
+
+	def record_vote(self, participant, vote_name):
+		tally.record_vote(self.session.name, self.question, participant, vote_name)
+		# Counters move once the vote's transaction has committed
+		frappe.db.commit()
+
+	def test_vote_is_counted_once_by_name(self):
+		self.assertEqual(tally.rebuild_counts(self.session.name, self.question), {})
+
+		self.record_vote(self.alice, "vote-a")
+		self.record_vote(self.alice, "vote-a")
+		self.record_vote(self.bob, "vote-b")
+
+		self.assertEqual(tally.get_counts(self.session.name, self.question), {self.alice: 1, self.bob: 1})
+
+	def test_rebuild_keeps_votes_recorded_after_its_read(self):
+		make_vote(self.session, self.alice, "voter-0")
+		frappe.db.commit()
+		tally.clear_session_tallies(self.session.name)
+
+		# Recorded while the hash was missing, e.g. between a rebuild's SELECT and its replace
+		self.record_vote(self.bob, "vote-not-yet-read")
+
+		self.assertEqual(
+			tally.rebuild_counts(self.session.name, self.question), {self.alice: 1, self.bob: 1}
+		)
+
+	def test_vote_read_by_a_rebuild_is_not_counted_again(self):
+		vote_name = make_vote(self.session, self.alice, "voter-0")
+		tally.clear_session_tallies(self.session.name)
+		frappe.db.commit()
+
+		self.assertEqual(tally.rebuild_counts(self.session.name, self.question), {self.alice: 1})
+
+		# The vote's own increment lands after the rebuild already read it
+		self.record_vote(self.alice, vote_name)
+
+		self.assertEqual(tally.get_counts(self.session.name, self.question), {self.alice: 1})
+
+
+class TestVoteQueue(FrappeTestCase):
+	def setUp(self):
+		self.session = make_session()
+		self.question = self.session.questions[0]
+		self.alice, self.bob = self.session.participants
+
+		self.queue = get_redis_conn()
+		self.queue.delete(vote_queue._queue_key(), vote_queue._pending_key())
+
+	def tearDown(self):
+		self.queue.delete(vote_queue._queue_key(), vote_queue._pending_key())
+		delete_session(self.session)
+
+	def queue_vote(self, participant, voter):
+		# What submit_vote's fast path does: claim, then queue
+		vote_claims.claim(self.session.name, self.question, voter, participant, 60)
+		vote_queue.enqueue_vote(self.session.name, self.question, participant, voter)
+
+	def stored_votes(self):
+		return frappe.get_all(
+			"Game Vote",
+			filters={"session": self.session.name},
+			fields=["voter_ip", "participant"],
+			order_by="voter_ip ASC",
+			as_list=True,
+		)
+
+	def test_flush_stores_and_counts_queued_votes(self):
+		self.queue_vote(self.alice, "voter-1")
+		self.queue_vote(self.bob, "voter-2")
+
+		vote_queue.flush_vote_queue()
+
+		self.assertEqual(self.queue.llen(vote_queue._queue_key()), 0)
+		self.assertEqual(
+			[tuple(row) for row in self.stored_votes()],
+			[("voter-1", self.alice), ("voter-2", self.bob)],
+		)
+		self.assertEqual(
+			tally.get_counts(self.session.name, self.question), {self.alice: 1, self.bob: 1}
+		)
+
+	def test_flush_drops_a_duplicate_and_restores_its_claim(self):
+		make_vote(self.session, self.alice, "voter-1")
+		frappe.db.commit()
+		tally.rebuild_counts(self.session.name, self.question)
+
+		# The claim was lost, so a second vote got through to the queue
+		vote_claims.release(self.session.name, self.question, "voter-1")
+		self.queue_vote(self.bob, "voter-1")
+
+		vote_queue.flush_vote_queue()
+
+		self.assertEqual([tuple(row) for row in self.stored_votes()], [("voter-1", self.alice)])
+		self.assertEqual(tally.get_counts(self.session.name, self.question), {self.alice: 1})
+		self.assertEqual(vote_claims.get_vote(self.session.name, self.question, "voter-1"), self.alice)
+
+	def test_vote_queued_during_a_flush_schedules_another(self):
+		self.queue_vote(self.alice, "voter-1")
+		self.assertTrue(self.queue.exists(vote_queue._pending_key()))
+
+		# A running flush has cleared the flag, so the next vote schedules a new job
+		vote_queue.flush_vote_queue()
+		self.assertFalse(self.queue.exists(vote_queue._pending_key()))
+
+		self.queue_vote(self.bob, "voter-2")
+		self.assertTrue(self.queue.exists(vote_queue._pending_key()))
+
+	def test_late_votes_join_frozen_results(self):
+		make_vote(self.session, self.alice, "voter-1")
+		self.queue_vote(self.bob, "voter-2")
+		question_timer.finish_question(self.session.name, self.question)
+		frappe.db.commit()
+		self.assertEqual(
+			result_snapshots.get_frozen_counts(self.session.name, self.question),
+			{self.alice: 1, self.bob: 0},
+		)
+
+		vote_queue.flush_vote_queue()
+
+		self.assertEqual(
+			result_snapshots.get_frozen_counts(self.session.name, self.question),
+			{self.alice: 1, self.bob: 1},
+		)
+
+def read_archive(path):
+	"""Every archived row under an archive folder, by name"""
+	rows = {}
+	for folder, _, files in os.walk(path):
+		for file_name in files:
+			with gzip.open(os.path.join(folder, file_name), "rt", encoding="utf-8") as f:
+				for line in f:
+					row = json.loads(line)
+					rows[row["name"]] = row
+	return rows
+
+
+def count_archived_lines(path):
+	count = 0
+	for folder, _, files in os.walk(path):
+		for file_name in files:
+			with gzip.open(os.path.join(folder, file_name), "rt", encoding="utf-8") as f:
+				count += sum(1 for _ in f)
+	return count
+
+
+class TestVoteArchive(FrappeTestCase):
+	def setUp(self):
+		self.session = make_session()
+		self.votes = [
+			make_vote(self.session, self.session.participants[index % 2], f"voter-{index}")
+			for index in range(5)
+		]
+		frappe.db.set_value("Game Session", self.session.name, "status", "Completed")
+		frappe.db.commit()
+
+		self.archive_path = teardown.JsonArchive(label=f"votes/{self.session.name}").path
+
+	def tearDown(self):
+		shutil.rmtree(self.archive_path, ignore_errors=True)
+		delete_session(self.session)
+
+	def test_archive_moves_votes_and_keeps_their_count(self):
+		self.assertEqual(vote_archive.archive_session(self.session.name), 5)
+
+		self.assertFalse(frappe.db.exists("Game Vote", {"session": self.session.name}))
+		self.assertEqual(set(read_archive(self.archive_path)), set(self.votes))
+		# Results were frozen before the raw votes went
+		self.assertEqual(
+			frappe.db.count("Question Result", {"session": self.session.name}),
+			len(self.session.participants),
+		)
+
+		sessions = [frappe._dict(name=self.session.name)]
+		_add_counts(sessions)
+		self.assertEqual(sessions[0].vote_count, 5)
+
+		# Already archived: a second run does nothing
+		self.assertEqual(vote_archive.archive_session(self.session.name), 0)
+
+	def test_rearchived_chunk_replaces_its_file(self):
+		archive = teardown.JsonArchive(label=f"votes/{self.session.name}")
+		rows = frappe.get_all("Game Vote", filters={"session": self.session.name}, fields=["*"])
+
+		# A retried job archives the chunk whose delete never committed again
+		archive("Game Vote", rows)
+		archive("Game Vote", rows)
+
+		self.assertEqual(count_archived_lines(self.archive_path), 5)
+
+
+class TestTeardown(FrappeTestCase):
+	def setUp(self):
+		self.session = make_session()
+		for index in range(5):
+			make_vote(self.session, self.session.participants[index % 2], f"voter-{index}")
+		frappe.db.commit()
+		self.archive = teardown.JsonArchive(label=f"test/{frappe.generate_hash(length=8)}")
+
+	def tearDown(self):
+		shutil.rmtree(self.archive.path, ignore_errors=True)
+		delete_session(self.session)
+
+	def test_delete_in_chunks_deletes_archives_and_reports_each_chunk(self):
+		progress = []
+		deleted = teardown.delete_in_chunks(
+			"Game Vote",
+			{"session": self.session.name},
+			chunk_size=2,
+			archive=self.archive,
+			progress=lambda doctype, count: progress.append(count),
+		)
+
+		self.assertEqual(deleted, 5)
+		self.assertEqual(progress, [2, 4, 5])
+		self.assertFalse(frappe.db.exists("Game Vote", {"session": self.session.name}))
+		self.assertEqual(self.archive.rows, {"Game Vote": 5})
+		self.assertEqual(count_archived_lines(self.archive.path), 5)
+
+	def test_delete_in_chunks_only_touches_matching_rows(self):
+		other = make_session()
+		try:
+			make_vote(other, other.participants[0], "voter-0")
+			frappe.db.commit()
+
+			teardown.delete_votes(self.session.name, chunk_size=2)
+
+			self.assertFalse(frappe.db.exists("Game Vote", {"session": self.session.name}))
+			self.assertEqual(frappe.db.count("Game Vote", {"session": other.name}), 1)
+		finally:
+			delete_session(other)
@@ -0,0 +1,18 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class QuestionResult(Document):
+	pass
+
+
+def on_doctype_update():
+	# One frozen row per participant per closed question
+	frappe.db.add_unique(
+		"Question Result",
+		["session", "question", "participant"],
+		constraint_name="unique_session_question_participant",
+	)
@@ -0,0 +1,27 @@
+# Copyright (c) 2025, Amirah Michelle and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from fun_and_games.fun_and_games.result_snapshots import rank_counts
+
+
+class TestQuestionResult(FrappeTestCase):
+	def test_ties_share_a_rank_and_skip_the_next(self):
+		counts = {"SP-1": 5, "SP-2": 3, "SP-3": 3, "SP-4": 1}
+
+		self.assertEqual(
+			rank_counts(counts, ["SP-4", "SP-3", "SP-2", "SP-1"]),
+			{"SP-1": 1, "SP-2": 2, "SP-3": 2, "SP-4": 4},
+		)
+
+	def test_participants_without_votes_tie_last(self):
+		counts = {"SP-1": 2}
+
+		self.assertEqual(
+			rank_counts(counts, ["SP-1", "SP-2", "SP-3"]),
+			{"SP-1": 1, "SP-2": 2, "SP-3": 2},
+		)
+
+	def test_no_votes_at_all(self):
+		self.assertEqual(rank_counts({}, ["SP-1", "SP-2"]), {"SP-1": 1, "SP-2": 1})
@@ -1,9 +1,14 @@
 # Copyright (c) 2025, Fun and Games and contributors
 # For license information, please see license.txt
 
-import frappe
 from frappe.model.document import Document
 
+from fun_and_games.fun_and_games.session_cache import refresh_session_snapshot
+
 
 class SessionParticipant(Document):
-	pass
+	def on_update(self):
+		refresh_session_snapshot(self.session)
+
+	def on_trash(self):
+		refresh_session_snapshot(self.session)
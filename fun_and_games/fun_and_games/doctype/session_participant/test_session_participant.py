@@ -0,0 +1,259 @@
+# Copyright (c) 2025, Amirah Michelle and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from werkzeug.test import EnvironBuilder
+
+from fun_and_games.fun_and_games import (
+	api,
+	leaderboard,
+	question_timer,
+	result_snapshots,
+	roster,
+	voter_token,
+)
+from fun_and_games.fun_and_games.doctype.game_session.test_game_session import (
+	delete_session,
+	make_session,
+)
+from fun_and_games.fun_and_games.doctype.game_vote.test_game_vote import (
+	make_vote,
+	set_fast_vote_ingestion,
+)
+from fun_and_games.fun_and_games.roster import diff_participants
+
+
+def participant_row(name, participant_name, team, display_order):
+	return frappe._dict(
+		name=name, participant_name=participant_name, team=team, display_order=display_order
+	)
+
+
+class TestSessionParticipant(FrappeTestCase):
+	def setUp(self):
+		self.existing = [
+			participant_row("SP-1", "Alice", "Backend", 1),
+			participant_row("SP-2", "Bob", "Frontend", 2),
+			participant_row("SP-3", "Carol", "QA", 3),
+		]
+
+	def test_unchanged_roster_is_a_no_op(self):
+		roster = [
+			{"name": "Alice", "team": "Backend"},
+			{"name": "Bob", "team": "Frontend"},
+			{"name": "Carol", "team": "QA"},
+		]
+		self.assertEqual(diff_participants(self.existing, roster), ({}, [], []))
+
+	def test_reorder_only_updates_display_order(self):
+		roster = [
+			{"name": "Carol", "team": "QA"},
+			{"name": "Alice", "team": "Backend"},
+			{"name": "Bob", "team": "Frontend"},
+		]
+		updates, inserts, removed = diff_participants(self.existing, roster)
+
+		self.assertEqual(
+			updates,
+			{"SP-3": {"display_order": 1}, "SP-1": {"display_order": 2}, "SP-2": {"display_order": 3}},
+		)
+		self.assertEqual((inserts, removed), ([], []))
+
+	def test_rename_by_id_keeps_the_row(self):
+		roster = [
+			{"id": "SP-1", "name": "Alicia", "team": "Backend"},
+			{"name": "Bob", "team": "Frontend"},
+			{"name": "Carol", "team": "QA"},
+		]
+		updates, inserts, removed = diff_participants(self.existing, roster)
+
+		self.assertEqual(updates, {"SP-1": {"participant_name": "Alicia"}})
+		self.assertEqual((inserts, removed), ([], []))
+
+	def test_team_change_matches_by_name(self):
+		roster = [
+			{"name": "Alice", "team": "DevOps"},
+			{"name": "Bob", "team": "Frontend"},
+			{"name": "Carol", "team": "QA"},
+		]
+		updates, inserts, removed = diff_participants(self.existing, roster)
+
+		self.assertEqual(updates, {"SP-1": {"team": "DevOps"}})
+		self.assertEqual((inserts, removed), ([], []))
+
+	def test_exact_match_wins_over_name_only_match(self):
+		existing = [
+			participant_row("SP-1", "Sam", "Backend", 1),
+			participant_row("SP-2", "Sam", "Frontend", 2),
+		]
+		roster = [{"name": "Sam", "team": "Frontend"}, {"name": "Sam", "team": "Backend"}]
+		updates, inserts, removed = diff_participants(existing, roster)
+
+		# Rows swap places instead of swapping teams
+		self.assertEqual(updates, {"SP-2": {"display_order": 1}, "SP-1": {"display_order": 2}})
+		self.assertEqual((inserts, removed), ([], []))
+
+	def test_added_and_removed_participants(self):
+		roster = [
+			{"participant_name": "Alice", "team": "Backend"},
+			{"participant_name": "Dave", "team": "Scrum"},
+		]
+		updates, inserts, removed = diff_participants(self.existing, roster)
+
+		self.assertEqual(updates, {})
+		self.assertEqual(inserts, [("Dave", "Scrum", 2)])
+		self.assertEqual(removed, ["SP-2", "SP-3"])
+
+
+class TestLeaderboard(FrappeTestCase):
+	def setUp(self):
+		self.session = make_session(questions=2)
+		self.alice, self.bob = self.session.participants
+		leaderboard.clear(self.session.name)
+
+	def tearDown(self):
+		delete_session(self.session)
+
+	def increment(self, participant, vote_name, question_index=0):
+		leaderboard.increment(
+			self.session.name, self.session.questions[question_index], participant, vote_name
+		)
+
+	def test_increment_counts_a_vote_once(self):
+		leaderboard.rebuild(self.session.name)
+
+		self.increment(self.alice, "GV-TEST-1")
+		self.increment(self.alice, "GV-TEST-1")
+		self.increment(self.bob, "GV-TEST-2", question_index=1)
+
+		self.assertEqual(
+			leaderboard.get_standings(self.session.name), ({self.alice: 1, self.bob: 1}, 2)
+		)
+
+	def test_rebuild_then_increment_of_the_same_vote(self):
+		# The rebuild already read the committed vote when its increment arrives
+		vote = make_vote(self.session, self.alice, "voter-1")
+		leaderboard.rebuild(self.session.name)
+		self.increment(self.alice, vote)
+
+		self.assertEqual(leaderboard.get_standings(self.session.name), ({self.alice: 1}, 1))
+
+	def test_rebuild_keeps_votes_counted_after_its_read(self):
+		# Counted before the board was built and committed after the rebuild's SELECT
+		self.increment(self.bob, "GV-TEST-2", question_index=1)
+		make_vote(self.session, self.alice, "voter-1")
+
+		standings = leaderboard.rebuild(self.session.name)
+
+		self.assertEqual(standings, ({self.alice: 1, self.bob: 1}, 2))
+		self.assertEqual(leaderboard.get_standings(self.session.name), standings)
+
+	def test_persist_writes_participant_totals(self):
+		make_vote(self.session, self.alice, "voter-1")
+		make_vote(self.session, self.alice, "voter-2")
+		make_vote(self.session, self.bob, "voter-1", question=self.session.questions[1])
+
+		leaderboard.persist(self.session.name)
+
+		self.assertEqual(frappe.db.get_value("Session Participant", self.alice, "total_votes"), 2)
+		self.assertEqual(frappe.db.get_value("Session Participant", self.bob, "total_votes"), 1)
+		self.assertEqual(frappe.db.get_value("Game Session", self.session.name, "questions_voted"), 2)
+
+
+class TestUpdateParticipants(FrappeTestCase):
+	def setUp(self):
+		self.session = make_session(questions=2)
+		self.alice, self.bob = self.session.participants
+		self.played = self.session.questions[1]
+
+	def tearDown(self):
+		delete_session(self.session)
+
+	def test_removing_a_participant_deletes_their_votes_only(self):
+		make_vote(self.session, self.alice, "voter-0")
+		make_vote(self.session, self.bob, "voter-1")
+		make_vote(self.session, self.bob, "voter-2", question=self.played)
+		# The played question closed with Bob's vote in its results
+		question_timer.finish_question(self.session.name, self.played)
+		frappe.db.commit()
+
+		changes = roster.update_participants(self.session.name, [{"id": self.alice, "name": "Alice", "team": "QA"}])
+		frappe.db.commit()
+
+		self.assertEqual(changes["removed"], 1)
+		self.assertEqual(changes["removed_votes"], 2)
+		self.assertFalse(frappe.db.exists("Session Participant", self.bob))
+		self.assertEqual(
+			frappe.get_all("Game Vote", filters={"session": self.session.name}, pluck="participant"),
+			[self.alice],
+		)
+		self.assertEqual(result_snapshots.get_frozen_counts(self.session.name, self.played), {self.alice: 0, self.bob: 1})
+
+
+class TestCompactPayloads(FrappeTestCase):
+	def setUp(self):
+		self.fast_vote_ingestion = frappe.db.get_single_value("Game Settings", "fast_vote_ingestion")
+		set_fast_vote_ingestion(0)
+
+		self.session = make_session(participants=("Alice", "Bob", "Carol"))
+		self.alice, self.bob, self.carol = self.session.participants
+		self.previous_request = getattr(frappe.local, "request", None)
+
+	def tearDown(self):
+		frappe.local.request = self.previous_request
+		delete_session(self.session)
+		set_fast_vote_ingestion(self.fast_vote_ingestion)
+		frappe.db.commit()
+
+	def submit_vote(self, participant_index, roster_version):
+		cookie = f"{voter_token.COOKIE_NAME}={voter_token.make_token('0' * 24)}"
+		frappe.local.request = EnvironBuilder(headers={"Cookie": cookie}).get_request()
+		return api.submit_vote(
+			session=self.session.name,
+			participant_index=participant_index,
+			roster_version=roster_version,
+		)
+
+	def test_results_are_counts_in_roster_order(self):
+		make_vote(self.session, self.bob, "voter-0")
+		make_vote(self.session, self.bob, "voter-1")
+		make_vote(self.session, self.carol, "voter-2")
+		frappe.db.commit()
+
+		results = api.get_results(session=self.session.name, compact=1)
+
+		self.assertEqual(results["counts"], [0, 2, 1])
+		self.assertEqual(results["total_votes"], 3)
+		self.assertEqual(results["roster"], [["Alice", "QA"], ["Bob", "QA"], ["Carol", "QA"]])
+
+	def test_roster_is_only_sent_when_the_clients_is_stale(self):
+		roster_version = api.get_results(session=self.session.name, compact=1)["roster_version"]
+
+		current = api.get_results(session=self.session.name, compact=1, roster_version=roster_version)
+		self.assertNotIn("roster", current)
+		self.assertEqual(current["roster_version"], roster_version)
+
+		stale = api.get_results(session=self.session.name, compact=1, roster_version="stale")
+		self.assertIn("roster", stale)
+
+	def test_vote_by_roster_index(self):
+		roster_version = api.get_results(session=self.session.name, compact=1)["roster_version"]
+
+		response = self.submit_vote(1, roster_version)
+
+		self.assertTrue(response["success"])
+		self.assertEqual(response["voter_state"]["voted_index"], 1)
+		self.assertEqual(
+			frappe.get_all("Game Vote", filters={"session": self.session.name}, pluck="participant"),
+			[self.bob],
+		)
+
+	def test_vote_against_a_stale_roster_is_refused(self):
+		response = self.submit_vote(1, "stale")
+
+		self.assertFalse(response["success"])
+		self.assertEqual(response["message"], "The participant list has changed, please vote again")
+		# The refusal carries the current roster to vote against
+		self.assertIn("roster", response["voter_state"])
+		self.assertFalse(frappe.db.exists("Game Vote", {"session": self.session.name}))
@@ -0,0 +1,87 @@
+# Copyright (c) 2025, Amirah Michelle and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_to_date, now_datetime
+
+from fun_and_games.fun_and_games import api, question_timer, result_snapshots
+from fun_and_games.fun_and_games.doctype.game_session.test_game_session import (
+	delete_session,
+	make_session,
+)
+from fun_and_games.fun_and_games.doctype.game_vote.test_game_vote import make_vote
+
+GRACE_PERIOD_SECONDS = 5
+
+
+def set_game_settings(**values):
+	for field, value in values.items():
+		frappe.db.set_single_value("Game Settings", field, value)
+	frappe.clear_document_cache("Game Settings", "Game Settings")
+
+
+class TestQuestionTimer(FrappeTestCase):
+	def setUp(self):
+		self.settings = frappe.db.get_singles_dict("Game Settings")
+		set_game_settings(grace_period_seconds=GRACE_PERIOD_SECONDS, auto_advance_questions=0)
+
+		# The deadline passed a second ago, well within the grace period
+		self.session = make_session(questions=2, voting_deadline=add_to_date(now_datetime(), seconds=-1))
+		self.question = self.session.questions[0]
+		self.alice, self.bob = self.session.participants
+
+	def tearDown(self):
+		delete_session(self.session)
+		set_game_settings(
+			grace_period_seconds=self.settings.grace_period_seconds,
+			auto_advance_questions=self.settings.auto_advance_questions,
+		)
+		frappe.db.commit()
+
+	def is_completed(self, question):
+		return frappe.db.get_value(
+			"Session Question", {"session": self.session.name, "question": question}, "is_completed"
+		)
+
+	def expire(self):
+		deadline = add_to_date(now_datetime(), seconds=-(GRACE_PERIOD_SECONDS + 1))
+		frappe.db.set_value("Game Session", self.session.name, "voting_deadline", deadline)
+
+	def test_question_stays_open_during_the_grace_period(self):
+		self.assertFalse(question_timer.close_question(self.session.name))
+		self.assertFalse(self.is_completed(self.question))
+		self.assertIsNone(result_snapshots.get_frozen_counts(self.session.name, self.question))
+
+	def test_close_after_the_grace_period_freezes_results(self):
+		make_vote(self.session, self.alice, "voter-1")
+		make_vote(self.session, self.alice, "voter-2")
+		self.expire()
+
+		self.assertTrue(question_timer.close_question(self.session.name))
+
+		self.assertTrue(self.is_completed(self.question))
+		self.assertEqual(
+			result_snapshots.get_frozen_counts(self.session.name, self.question),
+			{self.alice: 2, self.bob: 0},
+		)
+		# Closed once: a second run finds it completed
+		self.assertFalse(question_timer.close_question(self.session.name))
+
+	def test_auto_advance_starts_the_next_question(self):
+		set_game_settings(auto_advance_questions=1)
+		self.expire()
+
+		self.assertTrue(question_timer.close_question(self.session.name))
+		self.assertEqual(
+			frappe.db.get_value("Game Session", self.session.name, "current_question"),
+			self.session.questions[1],
+		)
+
+	def test_clear_expired_question_closes_through_the_timer(self):
+		self.assertFalse(api.clear_expired_question(self.session.name)["success"])
+
+		self.expire()
+		self.assertTrue(api.clear_expired_question(self.session.name)["success"])
+		self.assertTrue(self.is_completed(self.question))
+		self.assertIsNotNone(result_snapshots.get_frozen_counts(self.session.name, self.question))
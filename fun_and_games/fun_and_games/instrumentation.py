@@ -0,0 +1,166 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+import functools
+import time
+
+import frappe
+
+METRICS_KEY_PREFIX = "fun_and_games:api_metrics:"
+
+# Per-minute buckets are kept this long; get_api_metrics aggregates over them
+WINDOW_MINUTES = 15
+
+# Latency histogram bucket upper bounds in milliseconds; anything slower lands in "inf"
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+
+
+class QueryCounter:
+    """Counts SQL statements and rows read through a database connection while active"""
+
+    def __init__(self, db):
+        self.db = db
+        self.queries = 0
+        self.rows = 0
+        self._sql = db.sql
+
+    def __call__(self, *args, **kwargs):
+        result = self._sql(*args, **kwargs)
+        self.queries += 1
+        if isinstance(result, (list, tuple)):
+            self.rows += len(result)
+        return result
+
+    def __enter__(self):
+        self.db.sql = self
+        return self
+
+    def __exit__(self, *exc_info):
+        self.db.sql = self._sql
+
+
+def record_cache_hit():
+    """Called by the cache layers so instrumented calls can report their hit count"""
+    frappe.flags.fun_and_games_cache_hits = (
+        frappe.flags.fun_and_games_cache_hits or 0
+    ) + 1
+
+
+def is_enabled():
+    return bool(frappe.get_cached_doc("Game Settings").enable_api_metrics)
+
+
+def instrument(fn):
+    """Record wall time, SQL queries, rows read and cache hits for an API endpoint"""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not is_enabled():
+            return fn(*args, **kwargs)
+
+        frappe.flags.fun_and_games_cache_hits = 0
+        started = time.perf_counter()
+        with QueryCounter(frappe.db) as counter:
+            response = fn(*args, **kwargs)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        failed = isinstance(response, dict) and response.get("success") is False
+        try:
+            _record(
+                fn.__name__,
+                elapsed_ms,
+                counter.queries,
+                counter.rows,
+                frappe.flags.fun_and_games_cache_hits,
+                failed,
+            )
+        except Exception:
+            # Metrics must never break the game
+            frappe.log_error(f"Failed to record API metrics for {fn.__name__}")
+
+        return response
+
+    return wrapper
+
+
+def _bucket_label(elapsed_ms):
+    for bound in LATENCY_BUCKETS_MS:
+        if elapsed_ms <= bound:
+            return str(bound)
+    return "inf"
+
+
+def _minute_key(minute):
+    return frappe.cache.make_key(f"{METRICS_KEY_PREFIX}{minute}")
+
+
+def _record(endpoint, elapsed_ms, queries, rows, cache_hits, failed):
+    key = _minute_key(int(time.time() // 60))
+
+    pipe = frappe.cache.pipeline(transaction=False)
+    pipe.hincrby(key, f"{endpoint}:calls", 1)
+    pipe.hincrbyfloat(key, f"{endpoint}:ms", elapsed_ms)
+    pipe.hincrby(key, f"{endpoint}:queries", queries)
+    pipe.hincrby(key, f"{endpoint}:rows", rows)
+    pipe.hincrby(key, f"{endpoint}:cache_hits", cache_hits)
+    pipe.hincrby(key, f"{endpoint}:failures", int(failed))
+    pipe.hincrby(key, f"{endpoint}:le_{_bucket_label(elapsed_ms)}", 1)
+    pipe.expire(key, (WINDOW_MINUTES + 1) * 60)
+    pipe.execute()
+
+
+def _percentile_from_buckets(buckets, calls, percentile):
+    """Upper bound of the histogram bucket holding the given percentile"""
+    target = calls * percentile / 100
+    seen = 0
+    for label in [str(bound) for bound in LATENCY_BUCKETS_MS] + ["inf"]:
+        seen += buckets.get(label, 0)
+        if seen >= target:
+            return label
+    return "inf"
+
+
+def get_metrics(minutes=WINDOW_MINUTES):
+    """Aggregate the rolling per-minute histograms into per-endpoint stats"""
+    current_minute = int(time.time() // 60)
+
+    pipe = frappe.cache.pipeline(transaction=False)
+    for minute in range(current_minute - minutes + 1, current_minute + 1):
+        pipe.hgetall(_minute_key(minute))
+
+    totals = {}
+    for minute_hash in pipe.execute():
+        for field, value in minute_hash.items():
+            endpoint, metric = field.decode().rsplit(":", 1)
+            endpoint_totals = totals.setdefault(endpoint, {})
+            endpoint_totals[metric] = endpoint_totals.get(metric, 0) + float(value)
+
+    metrics = []
+    for endpoint, endpoint_totals in totals.items():
+        calls = int(endpoint_totals.get("calls", 0))
+        if not calls:
+            continue
+
+        buckets = {
+            metric[3:]: count
+            for metric, count in endpoint_totals.items()
+            if metric.startswith("le_")
+        }
+        metrics.append(
+            {
+                "endpoint": endpoint,
+                "calls": calls,
+                "failures": int(endpoint_totals.get("failures", 0)),
+                "avg_ms": round(endpoint_totals.get("ms", 0) / calls, 1),
+                "p50_ms": _percentile_from_buckets(buckets, calls, 50),
+                "p95_ms": _percentile_from_buckets(buckets, calls, 95),
+                "p99_ms": _percentile_from_buckets(buckets, calls, 99),
+                "queries_per_call": round(endpoint_totals.get("queries", 0) / calls, 2),
+                "rows_per_call": round(endpoint_totals.get("rows", 0) / calls, 1),
+                "cache_hits_per_call": round(
+                    endpoint_totals.get("cache_hits", 0) / calls, 2
+                ),
+            }
+        )
+
+    return sorted(metrics, key=lambda m: m["calls"], reverse=True)
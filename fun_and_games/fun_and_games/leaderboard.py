@@ -0,0 +1,222 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+import frappe
+
+from fun_and_games.fun_and_games.instrumentation import record_cache_hit
+
+SCORES_KEY_PREFIX = "fun_and_games:leaderboard:"
+QUESTIONS_KEY_PREFIX = "fun_and_games:leaderboard_questions:"
+# Vote name -> "question|participant" of every vote already counted into a leaderboard
+COUNTED_KEY_PREFIX = "fun_and_games:leaderboard_votes:"
+LEADERBOARD_TTL = 24 * 60 * 60
+
+# Member of the questions set marking the leaderboard as fully built from `tabGame Vote`
+READY_MEMBER = "_ready"
+
+# Same contract as the tally counters: a vote is counted at most once, by name,
+# and only into a leaderboard built from the database. A vote arriving before
+# that is still remembered, so a rebuild already past its SELECT adds it.
+INCREMENT_IF_READY = """
+local added = redis.call('HSETNX', KEYS[3], ARGV[4], ARGV[3] .. '|' .. ARGV[2])
+redis.call('EXPIRE', KEYS[3], ARGV[5])
+if added == 1 and redis.call('SISMEMBER', KEYS[2], ARGV[1]) == 1 then
+    redis.call('ZINCRBY', KEYS[1], 1, ARGV[2])
+    redis.call('SADD', KEYS[2], ARGV[3])
+    return 1
+end
+return nil
+"""
+
+# Replace a leaderboard with what was read from the database plus the votes
+# recorded since that read. ARGV[3] is the number of (question, participant,
+# votes) triples of frozen questions that follow; the remaining arguments are
+# (name, question, participant) triples of votes on questions still open.
+REPLACE_STANDINGS = """
+local frozen = {}
+local questions = {}
+local scores = {}
+local first_vote = 4 + 3 * tonumber(ARGV[3])
+for i = 4, first_vote - 1, 3 do
+    frozen[ARGV[i]] = true
+    questions[ARGV[i]] = true
+    scores[ARGV[i + 1]] = (scores[ARGV[i + 1]] or 0) + tonumber(ARGV[i + 2])
+end
+
+local read = {}
+for i = first_vote, #ARGV, 3 do
+    read[ARGV[i]] = true
+    questions[ARGV[i + 1]] = true
+    scores[ARGV[i + 2]] = (scores[ARGV[i + 2]] or 0) + 1
+end
+
+-- Frozen results are final, so only votes on open questions are merged
+local counted = redis.call('HGETALL', KEYS[3])
+for i = 1, #counted, 2 do
+    local separator = string.find(counted[i + 1], '|', 1, true)
+    local question = string.sub(counted[i + 1], 1, separator - 1)
+    local participant = string.sub(counted[i + 1], separator + 1)
+    if not read[counted[i]] and not frozen[question] then
+        questions[question] = true
+        scores[participant] = (scores[participant] or 0) + 1
+    end
+end
+for i = first_vote, #ARGV, 3 do
+    redis.call('HSET', KEYS[3], ARGV[i], ARGV[i + 1] .. '|' .. ARGV[i + 2])
+end
+
+redis.call('DEL', KEYS[1], KEYS[2])
+redis.call('SADD', KEYS[2], ARGV[1])
+local question_count = 0
+for question in pairs(questions) do
+    redis.call('SADD', KEYS[2], question)
+    question_count = question_count + 1
+end
+
+local result = {question_count}
+for participant, score in pairs(scores) do
+    redis.call('ZADD', KEYS[1], score, participant)
+    table.insert(result, participant)
+    table.insert(result, score)
+end
+for i = 1, 3 do
+    redis.call('EXPIRE', KEYS[i], ARGV[2])
+end
+return result
+"""
+
+
+def _scores_key(session_id):
+    return frappe.cache.make_key(f"{SCORES_KEY_PREFIX}{session_id}")
+
+
+def _questions_key(session_id):
+    return frappe.cache.make_key(f"{QUESTIONS_KEY_PREFIX}{session_id}")
+
+
+def _counted_key(session_id):
+    return frappe.cache.make_key(f"{COUNTED_KEY_PREFIX}{session_id}")
+
+
+def _keys(session_id):
+    return [
+        _scores_key(session_id),
+        _questions_key(session_id),
+        _counted_key(session_id),
+    ]
+
+
+def increment(session_id, question_id, participant, vote_name):
+    """Add one committed vote to the session leaderboard"""
+    increment_if_ready = frappe.cache.register_script(INCREMENT_IF_READY)
+    increment_if_ready(
+        keys=_keys(session_id),
+        args=[READY_MEMBER, participant, question_id, vote_name, LEADERBOARD_TTL],
+    )
+
+
+def get_standings(session_id):
+    """Cumulative votes per participant and the number of questions voted on"""
+    pipe = frappe.cache.pipeline(transaction=False)
+    pipe.zrange(_scores_key(session_id), 0, -1, withscores=True)
+    pipe.smembers(_questions_key(session_id))
+    scores, questions = pipe.execute()
+
+    if READY_MEMBER.encode() not in questions:
+        return rebuild(session_id)
+
+    record_cache_hit()
+    return (
+        {participant.decode(): int(score) for participant, score in scores},
+        len(questions) - 1,
+    )
+
+
+def rebuild(session_id):
+    """Recount the session and replace its leaderboard.
+
+    Closed questions are read from their frozen results; only questions still
+    open are counted from `tabGame Vote`.
+    """
+    from fun_and_games.fun_and_games.result_snapshots import get_session_results
+
+    frozen = get_session_results(session_id)
+    frozen_rows = [
+        (question, participant, votes)
+        for question, counts in frozen.items()
+        for participant, votes in counts.items()
+        if votes
+    ]
+
+    open_filter = ""
+    if frozen:
+        open_filter = "AND question NOT IN %(frozen)s"
+    votes = frappe.db.sql(
+        f"""
+        SELECT name, question, participant
+        FROM `tabGame Vote`
+        WHERE session = %(session)s {open_filter}
+    """,
+        {"session": session_id, "frozen": tuple(frozen)},
+    )
+
+    replace_standings = frappe.cache.register_script(REPLACE_STANDINGS)
+    questions_voted, *scores = replace_standings(
+        keys=_keys(session_id),
+        args=[
+            READY_MEMBER,
+            LEADERBOARD_TTL,
+            len(frozen_rows),
+            *(field for row in frozen_rows for field in row),
+            *(field for vote in votes for field in vote),
+        ],
+    )
+
+    return (
+        {scores[i].decode(): int(scores[i + 1]) for i in range(0, len(scores), 2)},
+        int(questions_voted),
+    )
+
+
+def clear(session_id):
+    """Drop the cached leaderboard; the next read rebuilds it"""
+    frappe.cache.delete(*_keys(session_id))
+
+
+def persist(session_id):
+    """Background job: copy the leaderboard into the participant and session rows"""
+    from fun_and_games.fun_and_games.vote_queue import flush_vote_queue
+
+    # Votes still waiting in the ingestion queue belong to the question that just closed
+    flush_vote_queue()
+
+    scores, questions_voted = get_standings(session_id)
+    participants = frappe.get_all(
+        "Session Participant", filters={"session": session_id}, pluck="name"
+    )
+
+    frappe.db.bulk_update(
+        "Session Participant",
+        {name: {"total_votes": scores.get(name, 0)} for name in participants},
+        update_modified=False,
+    )
+    frappe.db.set_value(
+        "Game Session",
+        session_id,
+        "questions_voted",
+        questions_voted,
+        update_modified=False,
+    )
+    frappe.db.commit()
+
+
+def enqueue_persist(session_id):
+    """Persist the leaderboard once the closing transaction has committed"""
+    frappe.enqueue(
+        "fun_and_games.fun_and_games.leaderboard.persist",
+        queue="short",
+        job_id=f"fun_and_games_persist_leaderboard_{session_id}",
+        deduplicate=True,
+        enqueue_after_commit=True,
+        session_id=session_id,
+    )
@@ -0,0 +1,65 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.realtime import get_website_room
+
+from fun_and_games.fun_and_games.versioning import bump_version_after_commit
+
+# Single socket.io event carrying every session delta; pages switch on "type"
+LIVE_EVENT = "fun_and_games_session"
+
+RESULTS_PUSH_KEY_PREFIX = "fun_and_games:results_push:"
+RESULTS_PUSH_INTERVAL_MS = 1000
+
+
+def publish(session_id, event_type, **data):
+    """Push a session delta to the voting, results and admin pages once the transaction commits"""
+    bump_version_after_commit(session_id)
+
+    message = {"type": event_type, "session_id": session_id}
+    message.update(data)
+
+    frappe.publish_realtime(
+        LIVE_EVENT, message, room=get_website_room(), after_commit=True
+    )
+
+
+def publish_results_updated(session_id, question_id):
+    """Tell results pages a question's tally moved, at most once per second.
+
+    Called once votes are committed. Pages reload on it and check once more
+    after the interval, which picks up the votes whose pushes were held back.
+    """
+    key = frappe.cache.make_key(f"{RESULTS_PUSH_KEY_PREFIX}{session_id}:{question_id}")
+    if not frappe.cache.set(key, 1, px=RESULTS_PUSH_INTERVAL_MS, nx=True):
+        return
+
+    message = {
+        "type": "results_updated",
+        "session_id": session_id,
+        "question_id": question_id,
+    }
+    frappe.publish_realtime(LIVE_EVENT, message, room=get_website_room())
+
+
+def publish_setup_progress(state):
+    """Push background session creation progress to the page that requested it
+
+    Sent to the task room named after the request key, which the page joins;
+    a user room would be shared by every guest setting up a session.
+    """
+    message = {"type": "session_setup"}
+    message.update(state)
+
+    # Task rooms are sent to right away, which progress from inside the
+    # creating transaction needs
+    frappe.publish_realtime(LIVE_EVENT, message, task_id=state["request_key"])
+
+
+def get_channel_config():
+    """Socket.io connection details rendered into the www pages"""
+    return {
+        "sitename": frappe.local.site,
+        "socketio_port": frappe.conf.socketio_port or "",
+    }
@@ -0,0 +1,354 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+"""
+Load test harness for the live game endpoints.
+
+Creates a synthetic session through the API, then for each question spawns
+simulated voters (distinct IPs, User-Agents and voter tokens) that load the
+question with their vote status and vote, while a results poller hammers
+get_results. Run via: bench --site [site-name] fun-and-games-bench
+"""
+
+import random
+import threading
+import time
+from collections import defaultdict
+
+import frappe
+from werkzeug.test import EnvironBuilder
+
+from fun_and_games.fun_and_games import voter_token
+from fun_and_games.fun_and_games.instrumentation import QueryCounter
+
+RESULTS_ENDPOINT = "get_results"
+
+
+class EndpointStats:
+    """Latency and query samples collected across all worker threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(int)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, seconds, queries, ok):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            self.queries[endpoint] += queries
+            if not ok:
+                self.errors[endpoint] += 1
+
+    def summary(self, elapsed):
+        report = {}
+        for endpoint, samples in self.latencies.items():
+            samples = sorted(samples)
+            report[endpoint] = {
+                "calls": len(samples),
+                "errors": self.errors[endpoint],
+                "p50_ms": _percentile(samples, 50) * 1000,
+                "p95_ms": _percentile(samples, 95) * 1000,
+                "p99_ms": _percentile(samples, 99) * 1000,
+                "throughput": len(samples) / elapsed if elapsed else 0,
+                "queries_per_call": self.queries[endpoint] / len(samples),
+            }
+        return report
+
+
+def _percentile(sorted_samples, percentile):
+    if not sorted_samples:
+        return 0
+    index = round(percentile / 100 * (len(sorted_samples) - 1))
+    return sorted_samples[index]
+
+
+def run(
+    site,
+    voters=100,
+    questions=3,
+    participants=10,
+    concurrency=20,
+    double_tap=0.1,
+    poll_interval=1.0,
+    keep=False,
+):
+    """Run a full synthetic game and return the latency / integrity report"""
+    from fun_and_games.fun_and_games import api
+
+    frappe.init(site=site)
+    frappe.connect()
+    frappe.set_user("Administrator")
+    session_id = None
+
+    try:
+        session_id = _create_session(api, questions, participants)
+        question_ids = frappe.get_all(
+            "Session Question",
+            filters={"session": session_id},
+            order_by="question_order ASC",
+            pluck="question",
+        )
+        participant_ids = frappe.get_all(
+            "Session Participant", filters={"session": session_id}, pluck="name"
+        )
+        if not question_ids:
+            frappe.throw(
+                "No questions could be assigned. Add questions to Game Settings first."
+            )
+
+        api.start_session(session_id)
+
+        stats = EndpointStats()
+        accepted = {}
+
+        started = time.perf_counter()
+        for question_id in question_ids:
+            _activate(api, session_id, question_id)
+            accepted[question_id] = _play_question(
+                site,
+                session_id,
+                stats,
+                voters,
+                participant_ids,
+                concurrency,
+                double_tap,
+                poll_interval,
+            )
+        elapsed = time.perf_counter() - started
+
+        _flush_queued_votes()
+
+        return {
+            "session_id": session_id,
+            "voters": voters,
+            "questions": len(question_ids),
+            "elapsed_seconds": elapsed,
+            "endpoints": stats.summary(elapsed),
+            "votes": _check_votes(session_id, accepted),
+        }
+    finally:
+        if session_id and not keep:
+            _delete_session(session_id)
+        frappe.destroy()
+
+
+def _create_session(api, question_count, participant_count):
+    catalog = api.get_questions_from_settings()["questions"]
+    question_ids = [q["name"] for q in catalog[:question_count]]
+
+    result = api.create_session(
+        session_name=f"Load Test {frappe.generate_hash(length=6)}",
+        team_group="Custom",
+        description="Synthetic session created by fun-and-games-bench",
+        questions=question_ids,
+        participants=[
+            {"name": f"Load Test Player {i + 1}", "team": "QA"}
+            for i in range(participant_count)
+        ],
+    )
+    if not result.get("success"):
+        frappe.throw(result.get("message"))
+
+    return result["session_id"]
+
+
+def _activate(api, session_id, question_id):
+    result = api.activate_session_question(session_id, question_id)
+    if not result.get("success"):
+        frappe.throw(result.get("message"))
+    frappe.db.commit()
+
+
+def _play_question(
+    site,
+    session_id,
+    stats,
+    voters,
+    participant_ids,
+    concurrency,
+    double_tap,
+    poll_interval,
+):
+    """Run every voter against the open question
+
+    Returns the number of accepted submissions per voter id.
+    """
+    voting_done = threading.Event()
+    accepted_votes = []
+
+    def connect():
+        frappe.init(site=site)
+        frappe.connect()
+
+    def call(endpoint, ip, user_agent, token=None, **kwargs):
+        from fun_and_games.fun_and_games import api
+
+        headers = {"User-Agent": user_agent}
+        if token:
+            headers["Cookie"] = f"{voter_token.COOKIE_NAME}={token}"
+        frappe.local.request = EnvironBuilder(
+            headers=headers, environ_base={"REMOTE_ADDR": ip}
+        ).get_request()
+        frappe.local.request_ip = ip
+        frappe.set_user("Guest")
+
+        started = time.perf_counter()
+        with QueryCounter(frappe.db) as counter:
+            try:
+                response = getattr(api, endpoint)(**kwargs)
+                # Mirror the request lifecycle so after-commit work is included
+                frappe.db.commit()
+            except Exception:
+                frappe.db.rollback()
+                response = {"success": False}
+        stats.record(
+            endpoint,
+            time.perf_counter() - started,
+            counter.queries,
+            response.get("success", False),
+        )
+        return response
+
+    def vote(voter_index):
+        octets = (voter_index // 65536 % 256, voter_index // 256 % 256, voter_index % 256)
+        ip = "10.{}.{}.{}".format(*octets)
+        user_agent = f"FunAndGamesBench/{voter_index}"
+        # The phone's voter token cookie, as issued on its first page load
+        voter_id = f"{voter_index:024x}"
+        token = voter_token.make_token(voter_id)
+        # Like vote.html: compact state, then a vote by roster index
+        participant_index = random.randrange(len(participant_ids))
+
+        state = call(
+            "get_voter_state", ip, user_agent, token, session=session_id, compact=1
+        )
+        roster_version = state.get("roster_version")
+        accepted = call(
+            "submit_vote",
+            ip,
+            user_agent,
+            token,
+            participant_index=participant_index,
+            roster_version=roster_version,
+            session=session_id,
+        )
+
+        accepted_count = int(bool(accepted.get("success")))
+        if random.random() < double_tap:
+            # A second tap must be rejected; an accepted one is a dedup failure
+            second = call(
+                "submit_vote",
+                ip,
+                user_agent,
+                token,
+                participant_index=participant_index,
+                roster_version=roster_version,
+                session=session_id,
+            )
+            accepted_count += int(bool(second.get("success")))
+
+        return voter_id, accepted_count
+
+    def run_voters(worker_index):
+        connect()
+        try:
+            accepted_votes.append(
+                dict(vote(i) for i in range(worker_index, voters, concurrency))
+            )
+        finally:
+            frappe.destroy()
+
+    def poll_results():
+        connect()
+        try:
+            roster_version = None
+            while not voting_done.is_set():
+                # Like results.html: only the first poll carries the roster
+                response = call(
+                    RESULTS_ENDPOINT,
+                    "10.255.255.254",
+                    "FunAndGamesBench/results",
+                    session=session_id,
+                    compact=1,
+                    roster_version=roster_version,
+                )
+                roster_version = response.get("roster_version", roster_version)
+                voting_done.wait(poll_interval)
+        finally:
+            frappe.destroy()
+
+    poller = threading.Thread(target=poll_results)
+    poller.start()
+
+    workers = [
+        threading.Thread(target=run_voters, args=(i,)) for i in range(concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    voting_done.set()
+    poller.join()
+    return {
+        voter_id: count
+        for worker_votes in accepted_votes
+        for voter_id, count in worker_votes.items()
+    }
+
+
+def _flush_queued_votes():
+    from fun_and_games.fun_and_games.vote_queue import flush_vote_queue
+
+    flush_vote_queue()
+
+
+def _check_votes(session_id, accepted):
+    """Compare accepted submissions per voter with the rows stored in Game Vote
+
+    Runs after the ingestion queue was flushed, so fast path votes that were
+    accepted but dropped on the way show up as lost.
+    """
+    stored = defaultdict(int)
+    for question, voter, count in frappe.db.sql(
+        """
+        SELECT question, voter_ip, COUNT(*)
+        FROM `tabGame Vote`
+        WHERE session = %s
+        GROUP BY question, voter_ip
+    """,
+        (session_id,),
+    ):
+        stored[(question, voter)] = count
+
+    accepted_total = duplicates = lost = 0
+    for question, voters in accepted.items():
+        for voter, count in voters.items():
+            accepted_total += count
+            # Every submission past a voter's first that was accepted
+            duplicates += max(0, count - 1)
+            duplicates += max(0, stored[(question, voter)] - 1)
+            if count and not stored[(question, voter)]:
+                lost += 1
+
+    # Rows of voters whose every submission was refused
+    unexpected = sum(
+        1
+        for (question, voter), count in stored.items()
+        if count and not accepted.get(question, {}).get(voter)
+    )
+
+    return {
+        "accepted": accepted_total,
+        "stored": sum(stored.values()),
+        "duplicates": duplicates,
+        "lost": lost,
+        "unexpected": unexpected,
+    }
+
+
+def _delete_session(session_id):
+    from fun_and_games.fun_and_games.teardown import delete_sessions
+
+    delete_sessions([session_id])
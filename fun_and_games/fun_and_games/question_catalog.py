@@ -0,0 +1,84 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+import json
+
+import frappe
+
+CATALOG_KEY_PREFIX = "fun_and_games:question_catalog:"
+CATALOG_TTL = 24 * 60 * 60
+
+TRACK_FLAGS = (
+    "for_leadership_track",
+    "for_backend_track",
+    "for_frontend_track",
+    "for_custom_sessions",
+)
+
+# Shown by the setup pages while Game Settings has no questions yet
+SAMPLE_QUESTIONS = [
+    {
+        "name": "Q1",
+        "question_text": "Who is most likely to work late?",
+        "for_leadership_track": 1,
+        "for_backend_track": 1,
+        "for_frontend_track": 0,
+        "for_custom_sessions": 0,
+    },
+    {
+        "name": "Q2",
+        "question_text": "Who is most likely to debug on weekends?",
+        "for_leadership_track": 0,
+        "for_backend_track": 1,
+        "for_frontend_track": 1,
+        "for_custom_sessions": 0,
+    },
+]
+
+# Latest catalog per site in this worker, reused until Game Settings is modified
+_catalogs = {}
+
+
+def get_catalog():
+    """Parsed Game Settings questions with indexes, rebuilt only when the settings change.
+
+    Returns a dict with `questions` (in settings order), `by_id` and `by_track`
+    (track flag -> questions with that flag set). Treat it as read-only.
+    """
+    modified = str(frappe.get_cached_doc("Game Settings").modified)
+
+    catalog = _catalogs.get(frappe.local.site)
+    if catalog and catalog.modified == modified:
+        return catalog
+
+    questions = frappe.cache.get_value(CATALOG_KEY_PREFIX + modified)
+    if questions is None:
+        questions_json = frappe.get_cached_doc("Game Settings").questions_json
+        questions = json.loads(questions_json) if questions_json else []
+        frappe.cache.set_value(
+            CATALOG_KEY_PREFIX + modified, questions, expires_in_sec=CATALOG_TTL
+        )
+
+    catalog = frappe._dict(
+        modified=modified,
+        questions=questions,
+        by_id={q["name"]: q for q in questions if "name" in q},
+        by_track={
+            flag: [q for q in questions if q.get(flag)] for flag in TRACK_FLAGS
+        },
+    )
+    _catalogs[frappe.local.site] = catalog
+
+    return catalog
+
+
+def get_questions(track=None):
+    """Catalog questions, optionally only those with a track flag set; samples if empty"""
+    catalog = get_catalog()
+    if not catalog.questions:
+        return SAMPLE_QUESTIONS
+
+    if track:
+        return catalog.by_track.get(track, [])
+
+    return catalog.questions
@@ -0,0 +1,237 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+"""
+Server side question timer.
+
+Every activated question registers its closing time (voting deadline plus the
+grace period) in a Redis sorted set. Due questions are closed once each by
+short jobs that run and exit: the per-minute scheduler event, and a job
+nudged by the first read or vote that finds the question past its closing
+time. Closing marks the Session Question completed, freezes the tally,
+optionally activates the next question and pushes the transition to the
+pages. A question that is replaced before its deadline is finished the same
+way.
+"""
+
+import frappe
+from frappe.utils import add_to_date, now_datetime
+
+from fun_and_games.fun_and_games import live, result_snapshots, session_cache, tally
+from fun_and_games.fun_and_games.vote_queue import schedule_flush
+
+DEADLINES_KEY = "fun_and_games:question_deadlines"
+CLOSE_JOB_ID = "fun_and_games_close_due_questions"
+NUDGE_KEY_PREFIX = "fun_and_games:close_nudge:"
+
+# However many pages see an expired question, one close job per session per window
+NUDGE_INTERVAL_SECONDS = 2
+
+
+def _deadlines_key():
+    return frappe.cache.make_key(DEADLINES_KEY)
+
+
+def get_closing_time(voting_deadline):
+    """When the question stops accepting votes: the deadline plus the grace period"""
+    grace_period = frappe.get_cached_doc("Game Settings").grace_period_seconds or 0
+    return add_to_date(voting_deadline, seconds=grace_period)
+
+
+def schedule_close(session_id, voting_deadline):
+    """Have the timer close the session's current question once it has committed"""
+    closes_at = get_closing_time(voting_deadline).timestamp()
+
+    frappe.db.after_commit.add(
+        lambda: frappe.cache.zadd(_deadlines_key(), {session_id: closes_at})
+    )
+
+
+def finish_question(session_id, question_id):
+    """Mark a question completed and freeze its final tally; returns the counts"""
+    frappe.db.set_value(
+        "Session Question",
+        {"session": session_id, "question": question_id},
+        "is_completed",
+        1,
+    )
+    counts = tally.rebuild_counts(session_id, question_id)
+    result_snapshots.freeze(session_id, question_id, counts)
+    session_cache.refresh_session_snapshot(session_id)
+
+    return counts
+
+
+def start_question(session_doc, question_id, timer_seconds=None):
+    """Activate a question on an Active session, start its timer and notify the pages"""
+    previous = session_doc.current_question
+    if (
+        previous
+        and previous != question_id
+        and not frappe.db.get_value(
+            "Session Question",
+            {"session": session_doc.name, "question": previous},
+            "is_completed",
+        )
+    ):
+        # Advanced before its timer ran out: the previous question closes now.
+        # Its votes still queued are added to the frozen results by the flush job.
+        finish_question(session_doc.name, previous)
+        schedule_flush()
+
+    if timer_seconds is None:
+        settings = frappe.get_cached_doc("Game Settings")
+        timer_seconds = settings.voting_timer_seconds or 30
+
+    # Replaying a question reopens it
+    frappe.db.set_value(
+        "Session Question",
+        {"session": session_doc.name, "question": question_id},
+        "is_completed",
+        0,
+    )
+    result_snapshots.invalidate(session_doc.name, question_id)
+    result = session_doc.activate_question(question_id, timer_seconds)
+
+    # Warm the counters so the first votes count straight into Redis
+    tally.rebuild_counts(session_doc.name, question_id)
+    schedule_close(session_doc.name, session_doc.voting_deadline)
+
+    question_text = frappe.db.get_value("Game Question", question_id, "question_text")
+    live.publish(
+        session_doc.name,
+        "question_activated",
+        question={"name": question_id, "question_text": question_text},
+        timer_seconds=timer_seconds,
+    )
+
+    return result
+
+
+def close_question(session_id):
+    """Close the session's current question if its time is up; True when closed"""
+    session_doc = frappe.get_doc("Game Session", session_id, for_update=True)
+    question_id = session_doc.current_question
+    if (
+        session_doc.status != "Active"
+        or not question_id
+        or not session_doc.voting_deadline
+    ):
+        return False
+
+    if now_datetime() < get_closing_time(session_doc.voting_deadline):
+        # Reactivated since it was scheduled; wait for the new deadline
+        schedule_close(session_id, session_doc.voting_deadline)
+        return False
+
+    session_question = frappe.db.get_value(
+        "Session Question",
+        {"session": session_id, "question": question_id},
+        ["name", "question_order", "is_completed"],
+        as_dict=True,
+    )
+    if not session_question or session_question.is_completed:
+        return False
+
+    results = finish_question(session_id, question_id)
+    # Late votes still in the ingestion queue join the frozen results when flushed
+    schedule_flush()
+
+    next_question = None
+    if frappe.get_cached_doc("Game Settings").auto_advance_questions:
+        next_question = frappe.db.get_value(
+            "Session Question",
+            {
+                "session": session_id,
+                "is_completed": 0,
+                "question_order": (">", session_question.question_order or 0),
+            },
+            "question",
+            order_by="question_order ASC",
+        )
+
+    live.publish(
+        session_id,
+        "question_closed",
+        question_id=question_id,
+        results=results,
+        next_question_id=next_question,
+    )
+
+    if next_question:
+        start_question(session_doc, next_question)
+
+    return True
+
+
+def close_due_questions():
+    """Close every question whose closing time has passed"""
+    key = _deadlines_key()
+    due = frappe.cache.zrangebyscore(key, "-inf", now_datetime().timestamp())
+
+    for member in due:
+        session_id = member.decode()
+        # Only the worker that removes the entry closes the question
+        if not frappe.cache.zrem(key, session_id):
+            continue
+
+        try:
+            close_question(session_id)
+            frappe.db.commit()
+        except Exception:
+            frappe.db.rollback()
+            frappe.log_error(f"Error closing question for session {session_id}")
+
+    return len(due)
+
+
+def resync_deadlines():
+    """Re-register open questions from the database, e.g. after Redis was flushed"""
+    open_questions = frappe.db.sql(
+        """
+        SELECT gs.name, gs.voting_deadline
+        FROM `tabGame Session` gs
+        JOIN `tabSession Question` sq
+            ON sq.session = gs.name AND sq.question = gs.current_question
+        WHERE gs.status = 'Active'
+            AND gs.voting_deadline IS NOT NULL
+            AND sq.is_completed = 0
+    """
+    )
+
+    if open_questions:
+        frappe.cache.zadd(
+            _deadlines_key(),
+            {
+                session_id: get_closing_time(deadline).timestamp()
+                for session_id, deadline in open_questions
+            },
+        )
+
+
+def close_if_due(snapshot):
+    """Nudge a close job when a read or vote finds the open question past closing"""
+    session = snapshot.session
+    if (
+        snapshot.question_completed
+        or not session.voting_deadline
+        or session_cache.is_accepting_votes(snapshot)
+    ):
+        return
+
+    nudge_key = frappe.cache.make_key(f"{NUDGE_KEY_PREFIX}{session.name}")
+    if not frappe.cache.set(nudge_key, 1, nx=True, ex=NUDGE_INTERVAL_SECONDS):
+        return
+
+    frappe.enqueue(
+        "fun_and_games.fun_and_games.question_timer.close_due_questions",
+        queue="short",
+        job_id=CLOSE_JOB_ID,
+        deduplicate=True,
+    )
+
+
+def run_scheduled_close():
+    """Scheduler event: close every due question, then exit"""
+    resync_deadlines()
+    close_due_questions()
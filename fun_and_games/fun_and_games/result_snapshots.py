@@ -0,0 +1,108 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.utils import now_datetime
+
+RESULT_FIELDS = [
+    "name",
+    "creation",
+    "modified",
+    "owner",
+    "modified_by",
+    "session",
+    "question",
+    "participant",
+    "votes",
+    "rank",
+    "closed_at",
+]
+
+
+def rank_counts(counts, participants):
+    """Competition ranking (1, 2, 2, 4) of every participant by votes"""
+    ordered = sorted(participants, key=lambda name: -counts.get(name, 0))
+
+    ranks = {}
+    for position, participant in enumerate(ordered, start=1):
+        previous = ordered[position - 2] if position > 1 else None
+        if previous and counts.get(previous, 0) == counts.get(participant, 0):
+            ranks[participant] = ranks[previous]
+        else:
+            ranks[participant] = position
+
+    return ranks
+
+
+def freeze(session_id, question_id, counts):
+    """Store a closed question's final tally for every session participant"""
+    participants = frappe.get_all(
+        "Session Participant", filters={"session": session_id}, pluck="name"
+    )
+    ranks = rank_counts(counts, participants)
+
+    now = now_datetime()
+    user = frappe.session.user
+
+    invalidate(session_id, question_id)
+    frappe.db.bulk_insert(
+        "Question Result",
+        RESULT_FIELDS,
+        [
+            (
+                frappe.generate_hash(length=12),
+                now,
+                now,
+                user,
+                user,
+                session_id,
+                question_id,
+                participant,
+                counts.get(participant, 0),
+                ranks[participant],
+                now,
+            )
+            for participant in participants
+        ],
+    )
+
+
+def get_frozen_counts(session_id, question_id):
+    """Votes per participant of a closed question, or None if it was not frozen"""
+    rows = frappe.db.sql(
+        """
+        SELECT participant, votes
+        FROM `tabQuestion Result`
+        WHERE session = %s AND question = %s
+    """,
+        (session_id, question_id),
+    )
+    if not rows:
+        return None
+
+    return dict(rows)
+
+
+def get_session_results(session_id):
+    """Frozen votes of every closed question: {question: {participant: votes}}"""
+    results = {}
+    for question, participant, votes in frappe.db.sql(
+        """
+        SELECT question, participant, votes
+        FROM `tabQuestion Result`
+        WHERE session = %s
+    """,
+        (session_id,),
+    ):
+        results.setdefault(question, {})[participant] = votes
+
+    return results
+
+
+def invalidate(session_id, question_id=None):
+    """Drop the frozen results of a question, or of every question of a session"""
+    filters = {"session": session_id}
+    if question_id:
+        filters["question"] = question_id
+
+    frappe.db.delete("Question Result", filters)
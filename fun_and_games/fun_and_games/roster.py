@@ -0,0 +1,159 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+"""
+Session rosters.
+
+Each session snapshot carries its participants as a compact roster, one
+[participant_name, team] entry per display position, and a roster version.
+Pages that pass compact=1 keep the roster locally and send its version back;
+responses then only include the roster when it changed and refer to
+participants by their index in it, so results are a plain vector of counts.
+
+Editing a roster is applied as a diff against the stored Session Participant
+rows: participants are matched by row id when the client sends it, then by
+name and team, then by name alone (a team change). Matched rows keep their
+names and the votes pointing at them; changed orders, names and teams go out
+in one bulk UPDATE, only new participants are inserted and only removed ones
+are deleted.
+"""
+
+import hashlib
+
+import frappe
+from frappe.utils import now_datetime
+
+
+def build_roster(session_id, participants):
+    """Compact roster of ordered participants and its version.
+
+    The version digests the session too, so two sessions never share one.
+    """
+    roster = [[p.participant_name, p.team] for p in participants]
+    digest = hashlib.sha1(frappe.as_json([session_id, roster]).encode())
+    return roster, digest.hexdigest()[:10]
+
+
+def get_roster(snapshot, roster_version=None):
+    """Roster fields of a compact response: the roster only if the client's is stale"""
+    payload = {"roster_version": snapshot.roster_version}
+    if roster_version != snapshot.roster_version:
+        payload["roster"] = snapshot.roster
+
+    return payload
+
+
+def get_index(snapshot, participant):
+    """Roster index of a Session Participant, or None"""
+    return snapshot.participant_index.get(participant)
+
+
+def get_vector(snapshot, counts):
+    """Per participant counts as a list in roster order"""
+    return [counts.get(participant.name, 0) for participant in snapshot.participants]
+
+
+def diff_participants(existing, participants):
+    """Match an edited roster against the stored rows.
+
+    `existing` are Session Participant rows, `participants` the new roster in
+    display order ({"name" or "participant_name", "team", optional "id" of
+    the row it edits}). Returns the
+    field updates per matched row name, the (name, team, display_order) of
+    participants to insert and the names of rows to delete.
+    """
+    incoming = [
+        (p.get("participant_name") or p.get("name"), p["team"]) for p in participants
+    ]
+    rows_by_id = {row.name: row for row in existing}
+    matches = [rows_by_id.pop(p.get("id"), None) for p in participants]
+    unmatched = list(rows_by_id.values())
+
+    # Exact matches first, so a swap of teams never steals another row
+    for exact in (True, False):
+        for position, (name, team) in enumerate(incoming):
+            if matches[position]:
+                continue
+
+            for row in unmatched:
+                if row.participant_name == name and (row.team == team or not exact):
+                    matches[position] = row
+                    unmatched.remove(row)
+                    break
+
+    updates = {}
+    inserts = []
+    for order, ((name, team), row) in enumerate(zip(incoming, matches), start=1):
+        if not row:
+            inserts.append((name, team, order))
+            continue
+
+        changes = {}
+        if row.display_order != order:
+            changes["display_order"] = order
+        if row.participant_name != name:
+            changes["participant_name"] = name
+        if row.team != team:
+            changes["team"] = team
+        if changes:
+            updates[row.name] = changes
+
+    return updates, inserts, [row.name for row in unmatched]
+
+
+def update_participants(session_id, participants):
+    """Apply an edited roster to a session.
+
+    Votes for removed participants are deleted with them, in committed chunks
+    (see teardown), before anything else is written; the rest of the roster is
+    written in the current transaction. Frozen Question Result rows are kept:
+    completed questions show the results they closed with. Returns the number
+    of updated, inserted and removed participants and of removed votes.
+    """
+    from fun_and_games.fun_and_games import bulk_create, teardown
+
+    existing = frappe.get_all(
+        "Session Participant",
+        filters={"session": session_id},
+        fields=["name", "participant_name", "team", "display_order"],
+    )
+    updates, inserts, removed = diff_participants(existing, participants)
+
+    removed_votes = sum(
+        teardown.delete_in_chunks(
+            "Game Vote", {"session": session_id, "participant": participant}
+        )
+        for participant in removed
+    )
+
+    if updates:
+        frappe.db.bulk_update("Session Participant", updates)
+
+    if inserts:
+        now = now_datetime()
+        user = frappe.session.user
+        series = bulk_create.get_naming_series("Session Participant")
+        frappe.db.bulk_insert(
+            "Session Participant",
+            bulk_create.SESSION_PARTICIPANT_FIELDS,
+            [
+                (name, now, now, user, user, series, session_id, *row)
+                for name, row in zip(
+                    bulk_create.reserve_names("Session Participant", len(inserts)),
+                    inserts,
+                )
+            ],
+        )
+
+    if removed:
+        frappe.db.sql(
+            "DELETE FROM `tabSession Participant` WHERE name IN %(removed)s",
+            {"removed": tuple(removed)},
+        )
+
+    return {
+        "updated": len(updates),
+        "inserted": len(inserts),
+        "removed": len(removed),
+        "removed_votes": removed_votes,
+    }
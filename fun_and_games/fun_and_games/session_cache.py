@@ -0,0 +1,218 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.utils import add_to_date, now_datetime
+
+from fun_and_games.fun_and_games.instrumentation import record_cache_hit
+from fun_and_games.fun_and_games.roster import build_roster
+from fun_and_games.fun_and_games.versioning import (
+    ALL_SESSIONS,
+    bump_version_after_commit,
+)
+
+ACTIVE_SESSION_KEY = "fun_and_games:active_session"
+SNAPSHOT_KEY_PREFIX = "fun_and_games:session_snapshot:"
+LOOKUP_KEY_PREFIX = "fun_and_games:session_lookup:"
+
+# Safety net for writes that bypass the controllers (raw SQL in the bench scripts)
+SNAPSHOT_TTL = 300
+
+
+def get_active_session_id():
+    """Session used when none is named: the latest started Active one, or None.
+
+    Cached including the "no session" case.
+    """
+    session_id = frappe.cache.get_value(ACTIVE_SESSION_KEY)
+
+    if session_id is None:
+        session_id = (
+            frappe.db.get_value(
+                "Game Session",
+                {"status": "Active"},
+                "name",
+                order_by="started_on DESC",
+            )
+            or ""
+        )
+        frappe.cache.set_value(
+            ACTIVE_SESSION_KEY, session_id, expires_in_sec=SNAPSHOT_TTL
+        )
+    else:
+        record_cache_hit()
+
+    return session_id or None
+
+
+def resolve_session_id(session=None):
+    """Session name for a session name or join code; the default session when empty"""
+    if not session:
+        return get_active_session_id()
+
+    session = str(session).strip()
+    key = LOOKUP_KEY_PREFIX + session.upper()
+    session_id = frappe.cache.get_value(key)
+
+    if session_id is None:
+        match = frappe.db.sql(
+            """
+            SELECT name FROM `tabGame Session`
+            WHERE name = %s OR join_code = %s
+            LIMIT 1
+        """,
+            (session, session.upper()),
+        )
+        session_id = match[0][0] if match else ""
+        frappe.cache.set_value(key, session_id, expires_in_sec=SNAPSHOT_TTL)
+    else:
+        record_cache_hit()
+
+    return session_id or None
+
+
+def get_snapshot(session=None):
+    """Snapshot of a session given by name or join code (default session when empty)"""
+    session_id = resolve_session_id(session)
+    if not session_id:
+        return None
+
+    return get_session_snapshot(session_id)
+
+
+def get_session_snapshot(session_id):
+    """Session row, current question and ordered participants in one cache read"""
+    snapshot = frappe.cache.get_value(SNAPSHOT_KEY_PREFIX + session_id)
+    if snapshot is None:
+        snapshot = build_session_snapshot(session_id)
+    else:
+        record_cache_hit()
+
+    return snapshot
+
+
+def build_session_snapshot(session_id):
+    """Query the session state and store it in the cache"""
+    session = frappe.db.get_value(
+        "Game Session",
+        session_id,
+        [
+            "name",
+            "session_name",
+            "join_code",
+            "team_group",
+            "status",
+            "current_question",
+            "question_start_time",
+            "voting_deadline",
+        ],
+        as_dict=True,
+    )
+    if not session:
+        return None
+
+    question = None
+    question_completed = False
+    if session.current_question:
+        question = frappe.db.get_value(
+            "Game Question",
+            session.current_question,
+            ["name", "question_text"],
+            as_dict=True,
+        )
+        question_completed = bool(
+            frappe.db.get_value(
+                "Session Question",
+                {"session": session_id, "question": session.current_question},
+                "is_completed",
+            )
+        )
+
+    participants = frappe.db.get_all(
+        "Session Participant",
+        filters={"session": session_id},
+        fields=["name", "participant_name", "team"],
+        order_by="display_order ASC, participant_name ASC",
+    )
+
+    settings = frappe.get_cached_doc("Game Settings")
+    roster, roster_version = build_roster(session_id, participants)
+
+    snapshot = frappe._dict(
+        session=session,
+        question=question,
+        question_completed=question_completed,
+        participants=participants,
+        participant_ids={p.name for p in participants},
+        # Compact form of the participants, materialised once per session version
+        roster=roster,
+        roster_version=roster_version,
+        participant_index={p.name: index for index, p in enumerate(participants)},
+        grace_period_seconds=settings.grace_period_seconds or 0,
+        fast_vote_ingestion=settings.fast_vote_ingestion,
+    )
+    frappe.cache.set_value(
+        SNAPSHOT_KEY_PREFIX + session_id, snapshot, expires_in_sec=SNAPSHOT_TTL
+    )
+
+    return snapshot
+
+
+def get_time_remaining(snapshot):
+    """Seconds left on the current question's timer"""
+    deadline = snapshot.session.voting_deadline
+    if not deadline:
+        return 0
+
+    return max(0, int((deadline - now_datetime()).total_seconds()))
+
+
+def is_accepting_votes(snapshot):
+    """Whether the deadline plus the configured grace period has not passed"""
+    deadline = snapshot.session.voting_deadline
+    if not deadline:
+        return True
+
+    deadline_with_grace = add_to_date(deadline, seconds=snapshot.grace_period_seconds)
+    return now_datetime() <= deadline_with_grace
+
+
+def clear_session_snapshot(session_id):
+    """Drop a session's snapshot and the active session pointer"""
+    frappe.cache.delete_value([SNAPSHOT_KEY_PREFIX + session_id, ACTIVE_SESSION_KEY])
+
+
+def clear_session_lookup(*sessions):
+    """Forget cached name / join code lookups, e.g. when a session is deleted"""
+    frappe.cache.delete_value(
+        [LOOKUP_KEY_PREFIX + session.upper() for session in sessions if session]
+    )
+
+
+def clear_all_snapshots():
+    """Drop every session snapshot, e.g. when the active session changes"""
+    frappe.cache.delete_keys(SNAPSHOT_KEY_PREFIX)
+    frappe.cache.delete_value(ACTIVE_SESSION_KEY)
+    bump_version_after_commit(ALL_SESSIONS)
+
+
+def refresh_session_snapshot(session_id):
+    """Invalidate a session's snapshot now and rebuild it once the transaction commits.
+
+    Rebuilding eagerly means the first burst of voters after a change finds a
+    warm cache instead of all missing at once.
+    """
+    clear_session_snapshot(session_id)
+    bump_version_after_commit(session_id)
+
+    frappe.flags.setdefault("fun_and_games_stale_sessions", set()).add(session_id)
+    frappe.db.after_commit.add(_rebuild_stale_snapshots)
+
+
+def _rebuild_stale_snapshots():
+    stale_sessions = frappe.flags.pop("fun_and_games_stale_sessions", None) or set()
+
+    for session_id in stale_sessions:
+        # Clear again: a reader may have cached the pre-commit state in between
+        clear_session_snapshot(session_id)
+        build_session_snapshot(session_id)
@@ -0,0 +1,138 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+"""
+Session creation as a background job.
+
+The setup page sends a request key with every create_session call. The key is
+claimed with a Redis SET NX, so a retried or double submitted request gets the
+first request's job back instead of creating a second session. In background
+mode the bulk insert runs on a worker, in one transaction, and progress is
+pushed over the live channel to a room only the requesting page joins (it is
+named after the request key); get_session_job serves the same state to pages
+that poll.
+"""
+
+import json
+import re
+
+import frappe
+
+from fun_and_games.fun_and_games import bulk_create, live
+
+JOB_KEY_PREFIX = "fun_and_games:create_session:"
+
+# Long enough for any retry; a request key is good for one session
+JOB_STATE_TTL = 24 * 60 * 60
+
+# Used when a worker serves it (common_site_config "workers"), else "long"
+SETUP_QUEUE = "fun_and_games_setup"
+
+# Doctypes in the order bulk_create inserts them, for the progress percentage
+CREATE_STAGES = (
+    "Game Question",
+    "Game Session",
+    "Session Question",
+    "Session Participant",
+)
+
+REQUEST_KEY_PATTERN = re.compile(r"[\w-]{8,64}")
+
+
+def _job_key(request_key):
+    return frappe.cache.make_key(f"{JOB_KEY_PREFIX}{request_key}")
+
+
+def validate_request_key(request_key):
+    if not REQUEST_KEY_PATTERN.fullmatch(request_key or ""):
+        frappe.throw("Invalid request key")
+
+
+def get_queue():
+    """The dedicated setup queue when a worker listens on it, otherwise long"""
+    from frappe.utils.background_jobs import get_queues_timeout
+
+    return SETUP_QUEUE if SETUP_QUEUE in get_queues_timeout() else "long"
+
+
+def get_job(request_key):
+    """State of the creation request with this key, or None"""
+    state = frappe.cache.get(_job_key(request_key))
+    return json.loads(state) if state else None
+
+
+def claim(request_key, job_id=None):
+    """Reserve a request key. Returns None when claimed, else the existing state"""
+    state = {
+        "request_key": request_key,
+        "job_id": job_id,
+        "status": "queued",
+        "progress": 0,
+        "session_id": None,
+        "message": None,
+    }
+    while not frappe.cache.set(
+        _job_key(request_key), json.dumps(state), nx=True, ex=JOB_STATE_TTL
+    ):
+        existing = get_job(request_key)
+        # Otherwise it expired in between; try the claim again
+        if existing:
+            return existing
+
+    return None
+
+
+def update_job(request_key, publish=True, **changes):
+    """Record a state change of a request and push it to the page that sent it"""
+    state = get_job(request_key) or {"request_key": request_key}
+    state.update(changes)
+    frappe.cache.set(_job_key(request_key), json.dumps(state), ex=JOB_STATE_TTL)
+
+    if publish:
+        live.publish_setup_progress(state)
+
+    return state
+
+
+def enqueue_create_session(request_key, **session):
+    """Queue a session for creation; returns the job state"""
+    job_id = f"fun_and_games_create_session_{request_key}"
+    existing = claim(request_key, job_id)
+    if existing:
+        return existing
+
+    frappe.enqueue(
+        "fun_and_games.fun_and_games.session_jobs.run_create_session",
+        queue=get_queue(),
+        job_id=job_id,
+        deduplicate=True,
+        request_key=request_key,
+        **session,
+    )
+    return get_job(request_key)
+
+
+def run_create_session(request_key, **session):
+    """Background job: create the session in one transaction, reporting progress"""
+    update_job(request_key, status="running")
+
+    def progress(doctype, rows):
+        done = CREATE_STAGES.index(doctype) + 1
+        update_job(
+            request_key,
+            stage=doctype,
+            progress=int(100 * done / len(CREATE_STAGES)),
+        )
+
+    try:
+        session_id = bulk_create.create_session(**session, progress=progress)
+        frappe.db.commit()
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(f"Error creating session in background: {str(e)}")
+        update_job(
+            request_key, status="failed", message=f"Error creating session: {str(e)}"
+        )
+        return
+
+    update_job(request_key, status="done", progress=100, session_id=session_id)
@@ -0,0 +1,169 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+import frappe
+
+from fun_and_games.fun_and_games import leaderboard, live
+from fun_and_games.fun_and_games.instrumentation import record_cache_hit
+from fun_and_games.fun_and_games.versioning import bump_version
+
+TALLY_KEY_PREFIX = "fun_and_games:tally:"
+# Vote name -> participant of every vote already counted into a tally
+COUNTED_KEY_PREFIX = "fun_and_games:tally_votes:"
+TALLY_TTL = 24 * 60 * 60
+
+# Marks a hash as fully built from `tabGame Vote`; a hash without it is rebuilt on read
+READY_FIELD = "_ready"
+
+# A vote is counted at most once, by name, so a rebuild racing with it can neither
+# lose nor double it. Only count into hashes that were built from the database;
+# the vote is still remembered, so a rebuild already past its SELECT adds it.
+INCREMENT_IF_READY = """
+local added = redis.call('HSETNX', KEYS[2], ARGV[3], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+if added == 1 and redis.call('HEXISTS', KEYS[1], ARGV[1]) == 1 then
+    return redis.call('HINCRBY', KEYS[1], ARGV[2], 1)
+end
+return nil
+"""
+
+# Replace a tally with the votes read from the database (ARGV[3..]: name,
+# participant pairs) plus votes recorded since that read, which it cannot include
+REPLACE_COUNTS = """
+local read = {}
+local counts = {}
+for i = 3, #ARGV, 2 do
+    read[ARGV[i]] = true
+    counts[ARGV[i + 1]] = (counts[ARGV[i + 1]] or 0) + 1
+end
+
+local counted = redis.call('HGETALL', KEYS[2])
+for i = 1, #counted, 2 do
+    if not read[counted[i]] then
+        counts[counted[i + 1]] = (counts[counted[i + 1]] or 0) + 1
+    end
+end
+for i = 3, #ARGV, 2 do
+    redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+end
+
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], ARGV[1], 1)
+local result = {}
+for participant, count in pairs(counts) do
+    redis.call('HSET', KEYS[1], participant, count)
+    table.insert(result, participant)
+    table.insert(result, count)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return result
+"""
+
+
+def _tally_key(session_id, question_id):
+    return frappe.cache.make_key(f"{TALLY_KEY_PREFIX}{session_id}:{question_id}")
+
+
+def _counted_key(session_id, question_id):
+    return frappe.cache.make_key(f"{COUNTED_KEY_PREFIX}{session_id}:{question_id}")
+
+
+def record_vote(session_id, question_id, participant, vote_name):
+    """Increment the participant's counters once the vote has been committed"""
+    keys = [_tally_key(session_id, question_id), _counted_key(session_id, question_id)]
+
+    def increment():
+        increment_if_ready = frappe.cache.register_script(INCREMENT_IF_READY)
+        increment_if_ready(
+            keys=keys, args=[READY_FIELD, participant, vote_name, TALLY_TTL]
+        )
+        leaderboard.increment(session_id, question_id, participant, vote_name)
+        # Cached results must not outlive a vote, whichever path stored it
+        bump_version(session_id)
+        live.publish_results_updated(session_id, question_id)
+
+    frappe.db.after_commit.add(increment)
+
+
+def get_counts(session_id, question_id):
+    """Votes per participant for a question, read straight from Redis"""
+    raw_counts = frappe.cache.execute_command(
+        "HGETALL", _tally_key(session_id, question_id)
+    )
+
+    if READY_FIELD.encode() not in raw_counts:
+        return rebuild_counts(session_id, question_id)
+
+    record_cache_hit()
+    return {
+        field.decode(): int(count)
+        for field, count in raw_counts.items()
+        if field.decode() != READY_FIELD
+    }
+
+
+def rebuild_counts(session_id, question_id):
+    """Recount a question's votes from `tabGame Vote` and replace its hash"""
+    votes = frappe.db.sql(
+        """
+        SELECT name, participant
+        FROM `tabGame Vote`
+        WHERE session = %s AND question = %s
+    """,
+        (session_id, question_id),
+    )
+
+    keys = [_tally_key(session_id, question_id), _counted_key(session_id, question_id)]
+    replace_counts = frappe.cache.register_script(REPLACE_COUNTS)
+    result = replace_counts(
+        keys=keys,
+        args=[READY_FIELD, TALLY_TTL, *(field for vote in votes for field in vote)],
+    )
+
+    return {
+        result[i].decode(): int(result[i + 1]) for i in range(0, len(result), 2)
+    }
+
+
+def clear_session_tallies(session_id, question_id=None):
+    """Drop cached counters for a question, or every question of a session"""
+    if question_id:
+        frappe.cache.delete(
+            _tally_key(session_id, question_id), _counted_key(session_id, question_id)
+        )
+    else:
+        frappe.cache.delete_keys(f"{TALLY_KEY_PREFIX}{session_id}:")
+        frappe.cache.delete_keys(f"{COUNTED_KEY_PREFIX}{session_id}:")
+
+
+def reconcile_session(session_id, question_id=None):
+    """Background job: rebuild counters from `tabGame Vote` after votes were deleted"""
+    clear_session_tallies(session_id, question_id)
+    leaderboard.clear(session_id)
+
+    if question_id:
+        rebuild_counts(session_id, question_id)
+    else:
+        # Only the question on screen is worth warming; the rest rebuild on demand
+        current_question = frappe.db.get_value(
+            "Game Session", session_id, "current_question"
+        )
+        if current_question:
+            rebuild_counts(session_id, current_question)
+
+    leaderboard.persist(session_id)
+
+
+def enqueue_reconcile(session_id, question_id=None):
+    """Clear a session's counters now and rebuild them in the background after commit"""
+    clear_session_tallies(session_id, question_id)
+    leaderboard.clear(session_id)
+
+    frappe.enqueue(
+        "fun_and_games.fun_and_games.tally.reconcile_session",
+        queue="short",
+        session_id=session_id,
+        question_id=question_id,
+        enqueue_after_commit=True,
+    )
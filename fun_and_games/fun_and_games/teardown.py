@@ -0,0 +1,167 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+"""
+Chunked deletion of session data.
+
+Rows are deleted by primary key, a chunk at a time, each chunk in its own
+short transaction, so clearing a big session never holds locks on
+`tabGame Vote` long enough to stall voting in other sessions. Rows can be
+handed to an archive before they are deleted, and progress is reported per
+chunk. Used by the reset endpoints and delete_all_sessions.py.
+
+Chunks are committed as they go: call these before any other writes of the
+request, and do cache invalidation afterwards.
+"""
+
+import gzip
+import json
+import os
+
+import frappe
+from frappe.utils import now_datetime
+
+CHUNK_SIZE = 1000
+
+# Children first, so a half finished teardown never leaves orphans behind
+SESSION_DOCTYPES = (
+    "Game Vote",
+    "Question Result",
+    "Session Participant",
+    "Session Question",
+    "Game Session",
+)
+
+ARCHIVE_FOLDER = "fun_and_games_archive"
+
+
+class JsonArchive:
+    """Writes archived rows as gzipped JSON lines, one file per chunk.
+
+    Files go to the site's private files under
+    fun_and_games_archive/<label>/<doctype>/, named after a chunk's first row.
+    A chunk archived again because its delete never committed (a retried job)
+    starts at the same row, so it replaces its file instead of duplicating it.
+    """
+
+    def __init__(self, label=None):
+        self.label = label or now_datetime().strftime("%Y%m%d-%H%M%S")
+        self.path = frappe.get_site_path("private", "files", ARCHIVE_FOLDER, self.label)
+        self.rows = {}
+
+    def __call__(self, doctype, rows):
+        folder = os.path.join(self.path, frappe.scrub(doctype))
+        os.makedirs(folder, exist_ok=True)
+        file_path = os.path.join(folder, f"{rows[0].name}.jsonl.gz")
+
+        # Written aside and moved into place, so a file always holds a whole chunk
+        partial_path = f"{file_path}.partial"
+        with gzip.open(partial_path, "wt", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, default=str, separators=(",", ":")))
+                f.write("\n")
+        os.replace(partial_path, file_path)
+
+        self.rows[doctype] = self.rows.get(doctype, 0) + len(rows)
+
+
+def print_progress(doctype, deleted):
+    print(f"   🗑️  {doctype}: {deleted} rows deleted")
+
+
+def delete_in_chunks(
+    doctype, filters=None, chunk_size=CHUNK_SIZE, archive=None, progress=None
+):
+    """Delete the rows of a doctype matching `filters`; returns the number deleted"""
+    table = f"`tab{doctype}`"
+    conditions = " AND ".join(f"`{field}` = %({field})s" for field in filters or {})
+    where = f"WHERE {conditions}" if conditions else ""
+    values = dict(filters or {}, chunk_size=chunk_size)
+
+    deleted = 0
+    while True:
+        rows = frappe.db.sql(
+            f"""
+            SELECT {'*' if archive else 'name'}
+            FROM {table}
+            {where}
+            ORDER BY name
+            LIMIT %(chunk_size)s
+        """,
+            values,
+            as_dict=True,
+        )
+        if not rows:
+            break
+
+        if archive:
+            archive(doctype, rows)
+
+        frappe.db.sql(
+            f"DELETE FROM {table} WHERE name IN %(names)s",
+            {"names": tuple(row.name for row in rows)},
+        )
+        frappe.db.commit()
+
+        deleted += len(rows)
+        if progress:
+            progress(doctype, deleted)
+
+    return deleted
+
+
+def delete_votes(session_id, question_id=None, **options):
+    """Delete a session's votes, or one question's; returns the number deleted"""
+    filters = {"session": session_id}
+    if question_id:
+        filters["question"] = question_id
+
+    return delete_in_chunks("Game Vote", filters, **options)
+
+
+def delete_sessions(session_ids=None, **options):
+    """Delete sessions with all their rows (every session when None) and their caches
+
+    Returns the number of deleted rows per doctype.
+    """
+    sessions = frappe.get_all(
+        "Game Session",
+        filters={"name": ("in", session_ids)} if session_ids is not None else None,
+        fields=["name", "join_code"],
+    )
+
+    counts = dict.fromkeys(SESSION_DOCTYPES, 0)
+    for session in sessions:
+        for doctype in SESSION_DOCTYPES:
+            field = "name" if doctype == "Game Session" else "session"
+            counts[doctype] += delete_in_chunks(
+                doctype, {field: session.name}, **options
+            )
+
+    if session_ids is None:
+        # Orphans of sessions removed by other means
+        for doctype in SESSION_DOCTYPES:
+            counts[doctype] += delete_in_chunks(doctype, **options)
+
+    _clear_caches(sessions)
+    return counts
+
+
+def _clear_caches(sessions):
+    from fun_and_games.fun_and_games import (
+        leaderboard,
+        session_cache,
+        tally,
+        versioning,
+        vote_claims,
+    )
+
+    for session in sessions:
+        session_cache.clear_session_snapshot(session.name)
+        session_cache.clear_session_lookup(session.name, session.join_code)
+        tally.clear_session_tallies(session.name)
+        leaderboard.clear(session.name)
+        vote_claims.clear_claims(session.name)
+
+    if sessions:
+        versioning.bump_version(versioning.SESSION_LIST)
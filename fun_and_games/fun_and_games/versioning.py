@@ -0,0 +1,105 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+import functools
+import time
+
+import frappe
+from werkzeug.wrappers import Response
+
+VERSION_KEY_PREFIX = "fun_and_games:session_version:"
+
+# Pseudo-session bumped by changes that can affect every session (questions, settings)
+ALL_SESSIONS = "_all"
+
+# Pseudo-session bumped when sessions are created, deleted or change status
+SESSION_LIST = "_list"
+
+
+def _version_key(session_id):
+    return frappe.cache.make_key(f"{VERSION_KEY_PREFIX}{session_id}")
+
+
+def get_version(session_id):
+    """Current version of a session's state; changes whenever anything visible changes"""
+    key = _version_key(session_id)
+    version = frappe.cache.get(key)
+    if version is None:
+        # Seed from the clock so a Redis flush never hands out an old ETag again
+        frappe.cache.set(key, time.time_ns() // 1_000_000, nx=True)
+        version = frappe.cache.get(key)
+
+    return int(version)
+
+
+def bump_version(session_id):
+    key = _version_key(session_id)
+    if not frappe.cache.exists(key):
+        get_version(session_id)
+    frappe.cache.incr(key)
+
+
+def bump_version_after_commit(session_id):
+    """Bump once the change is visible, so no reader caches old data under a new ETag"""
+    frappe.db.after_commit.add(functools.partial(bump_version, session_id))
+
+
+def session_etag(session_id, *extra):
+    """ETag for a session's state: its own version plus the all-sessions version"""
+    return f'W/"{session_version_tag(session_id, *extra)}"'
+
+
+def session_version_tag(session_id, *extra):
+    """Opaque token that changes with the session or the all-sessions version"""
+    versions = frappe.cache.mget(
+        [_version_key(session_id), _version_key(ALL_SESSIONS)]
+    )
+    versions = [
+        int(version) if version is not None else get_version(name)
+        for name, version in zip((session_id, ALL_SESSIONS), versions)
+    ]
+
+    parts = (session_id, *versions, *extra)
+    return "-".join(str(part) for part in parts)
+
+
+def _is_http_call(fn):
+    """True when fn is the method the current request is calling (not an internal call)"""
+    return bool(
+        getattr(frappe.local, "request", None)
+        and frappe.form_dict.cmd == f"{fn.__module__}.{fn.__name__}"
+    )
+
+
+def conditional(etag_for):
+    """Answer If-None-Match with 304 and tag fresh responses with an ETag
+
+    etag_for receives the endpoint's arguments and returns the ETag for the state
+    the endpoint would serve, or None to skip validation. It must only read Redis;
+    work that has to happen on every poll belongs in the endpoint or a job.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _is_http_call(fn):
+                return fn(*args, **kwargs)
+
+            etag = etag_for(*args, **kwargs)
+            if not etag:
+                return fn(*args, **kwargs)
+
+            if frappe.get_request_header("If-None-Match") == etag:
+                return Response(status=304, headers={"ETag": etag})
+
+            from frappe.utils.response import build_response
+
+            frappe.response["message"] = fn(*args, **kwargs)
+            response = build_response("json")
+            response.headers["ETag"] = etag
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,120 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+"""
+Moves the raw votes of completed sessions out of `tabGame Vote`.
+
+Once a session is Completed its results are frozen into Question Result rows
+and the leaderboard totals are stored on the participants; after that the
+raw votes are only needed for audits. They are written to gzipped JSON
+lines files under the site's private files, one per deleted chunk
+(fun_and_games_archive/votes/<session>/game_vote/), keeping the table behind
+vote dedup and live tallies small.
+"""
+
+import frappe
+from frappe.utils import now_datetime
+
+from fun_and_games.fun_and_games import leaderboard, question_timer, teardown
+
+
+def archive_session(session_id):
+    """Background job: freeze results and archive the votes of a Completed session"""
+    from fun_and_games.fun_and_games.vote_queue import flush_vote_queue
+
+    session = frappe.db.get_value(
+        "Game Session",
+        session_id,
+        ["status", "current_question", "votes_archived_on"],
+        as_dict=True,
+    )
+    if not session or session.status != "Completed" or session.votes_archived_on:
+        return 0
+
+    flush_vote_queue()
+
+    # Results must not depend on the raw votes any more before they go
+    _freeze_played_questions(session_id, session.current_question)
+    frappe.db.commit()
+    leaderboard.persist(session_id)
+
+    archive = teardown.JsonArchive(label=f"votes/{session_id}")
+
+    def archive_chunk(doctype, rows):
+        archive(doctype, rows)
+        # Counted in the transaction deleting the chunk, so a retried run that
+        # picks up after a failure neither loses nor repeats a chunk's votes
+        frappe.db.sql(
+            """
+            UPDATE `tabGame Session`
+            SET archived_votes = archived_votes + %s
+            WHERE name = %s
+        """,
+            (len(rows), session_id),
+        )
+
+    teardown.delete_votes(session_id, archive=archive_chunk)
+
+    frappe.db.set_value(
+        "Game Session",
+        session_id,
+        "votes_archived_on",
+        now_datetime(),
+        update_modified=False,
+    )
+    frappe.db.commit()
+
+    return frappe.db.get_value("Game Session", session_id, "archived_votes")
+
+
+def _freeze_played_questions(session_id, current_question=None):
+    """Freeze every question that has votes (or is on screen) but no result rows"""
+    unfrozen = frappe.db.sql(
+        """
+        SELECT DISTINCT sq.question
+        FROM `tabSession Question` sq
+        WHERE sq.session = %(session)s
+            AND (
+                sq.question = %(current)s
+                OR EXISTS (
+                    SELECT 1 FROM `tabGame Vote` gv
+                    WHERE gv.session = sq.session AND gv.question = sq.question
+                )
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM `tabQuestion Result` qr
+                WHERE qr.session = sq.session AND qr.question = sq.question
+            )
+    """,
+        {"session": session_id, "current": current_question or ""},
+        pluck=True,
+    )
+
+    for question_id in unfrozen:
+        question_timer.finish_question(session_id, question_id)
+
+
+def enqueue_archive(session_id):
+    """Archive a session's votes once the transaction completing it has committed"""
+    frappe.enqueue(
+        "fun_and_games.fun_and_games.vote_archive.archive_session",
+        queue="long",
+        job_id=f"fun_and_games_archive_votes_{session_id}",
+        deduplicate=True,
+        enqueue_after_commit=True,
+        session_id=session_id,
+    )
+
+
+def archive_completed_sessions():
+    """Scheduler event: archive Completed sessions that were missed, e.g. set via SQL"""
+    for session_id in frappe.get_all(
+        "Game Session",
+        filters={"status": "Completed", "votes_archived_on": ("is", "not set")},
+        pluck="name",
+    ):
+        try:
+            archive_session(session_id)
+        except Exception:
+            frappe.db.rollback()
+            frappe.log_error(f"Error archiving votes of session {session_id}")
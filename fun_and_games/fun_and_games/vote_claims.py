@@ -0,0 +1,88 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+"""
+One vote per voter per question.
+
+A vote is claimed with a single Redis SET NX before anything is written, so two
+simultaneous taps from the same phone cannot both get through. The claim lives
+for the question's voting window; the (session, question, voter_ip) unique key
+on `tabGame Vote` stays the source of truth when Redis has lost a claim.
+"""
+
+import frappe
+
+from fun_and_games.fun_and_games import session_cache, voter_token
+
+CLAIM_KEY_PREFIX = "fun_and_games:vote_claim:"
+
+# Claims outlive the voting window so late retries still hit them
+CLAIM_TTL_MARGIN = 300
+
+
+def _claim_key(session_id, question_id, voter):
+    return frappe.cache.make_key(f"{CLAIM_KEY_PREFIX}{session_id}:{question_id}:{voter}")
+
+
+def get_voter_identifier():
+    """The requesting voter, from the signed voter token cookie; None without one"""
+    return voter_token.get_voter_id()
+
+
+def get_claim_ttl(snapshot):
+    """Seconds a claim is kept: what is left of the voting window plus a margin"""
+    return (
+        session_cache.get_time_remaining(snapshot)
+        + snapshot.grace_period_seconds
+        + CLAIM_TTL_MARGIN
+    )
+
+
+def claim(session_id, question_id, voter, participant, ttl):
+    """Atomically reserve the voter's one vote for a question. False if already taken"""
+    return bool(
+        frappe.cache.set(
+            _claim_key(session_id, question_id, voter),
+            participant,
+            nx=True,
+            ex=max(int(ttl), 1),
+        )
+    )
+
+
+def release(session_id, question_id, voter):
+    """Give a claim back when the vote it reserved could not be stored"""
+    frappe.cache.delete(_claim_key(session_id, question_id, voter))
+
+
+def get_vote(session_id, question_id, voter, ttl=None):
+    """Participant the voter picked for a question, or None.
+
+    Reads the claim first; falls back to `tabGame Vote` and restores the claim
+    from it, so a voter costs at most one query per question.
+    """
+    if not voter:
+        return None
+
+    participant = frappe.cache.get(_claim_key(session_id, question_id, voter))
+    if participant:
+        return participant.decode()
+
+    participant = frappe.db.get_value(
+        "Game Vote",
+        {"session": session_id, "question": question_id, "voter_ip": voter},
+        "participant",
+    )
+    if participant and ttl:
+        claim(session_id, question_id, voter, participant, ttl)
+
+    return participant
+
+
+def clear_claims(session_id, question_id=None):
+    """Forget claimed votes after the underlying votes were reset"""
+    pattern = f"{CLAIM_KEY_PREFIX}{session_id}:"
+    if question_id:
+        pattern += f"{question_id}:"
+
+    frappe.cache.delete_keys(pattern)
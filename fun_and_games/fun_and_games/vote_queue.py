@@ -0,0 +1,154 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+"""
+Write-behind ingestion of accepted votes.
+
+Pending votes are kept in a list on the redis_queue instance, next to the jobs
+that flush them. Unlike redis_cache it does not evict keys under memory
+pressure, so a vote the voter was told was accepted cannot vanish before it
+is written.
+"""
+
+import json
+
+import frappe
+from frappe.utils import now_datetime
+from frappe.utils.background_jobs import get_redis_conn
+
+from fun_and_games.fun_and_games import result_snapshots, tally, vote_claims
+
+QUEUE_KEY = "fun_and_games:vote_queue"
+# Set while a flush job is scheduled that has not started reading the queue yet
+FLUSH_PENDING_KEY = "fun_and_games:vote_queue_flush_pending"
+# Lets a lost job be scheduled again; the per-minute flush runs regardless
+FLUSH_PENDING_TTL = 60
+BATCH_SIZE = 500
+
+VOTE_FIELDS = [
+    "name",
+    "creation",
+    "modified",
+    "owner",
+    "modified_by",
+    "session",
+    "question",
+    "participant",
+    "voter_ip",
+    "vote_timestamp",
+]
+
+
+def enqueue_vote(session_id, question_id, participant, voter):
+    """Append an accepted vote to the ingestion queue and make sure a flush is scheduled"""
+    vote = {
+        "session": session_id,
+        "question": question_id,
+        "participant": participant,
+        "voter_ip": voter,
+        "vote_timestamp": str(now_datetime()),
+    }
+    queue = get_redis_conn()
+    queue.rpush(_queue_key(), json.dumps(vote))
+    schedule_flush(queue)
+
+
+def schedule_flush(queue=None):
+    """Make sure a flush job runs after everything queued so far.
+
+    A job clears the pending flag before it reads the queue, so a vote pushed
+    while it runs schedules the next job instead of waiting for the scheduler.
+    """
+    queue = queue or get_redis_conn()
+    if queue.set(_pending_key(), 1, nx=True, ex=FLUSH_PENDING_TTL):
+        frappe.enqueue(
+            "fun_and_games.fun_and_games.vote_queue.flush_vote_queue", queue="short"
+        )
+
+
+def _queue_key():
+    # Same site prefix as cache keys, on the non-evicting queue instance
+    return frappe.cache.make_key(QUEUE_KEY)
+
+
+def _pending_key():
+    return frappe.cache.make_key(FLUSH_PENDING_KEY)
+
+
+def flush_vote_queue():
+    """Background job: bulk insert queued votes into `tabGame Vote` in batches"""
+    queue = get_redis_conn()
+    queue_key = _queue_key()
+    queue.delete(_pending_key())
+
+    while True:
+        pipe = queue.pipeline()
+        pipe.lrange(queue_key, 0, BATCH_SIZE - 1)
+        pipe.ltrim(queue_key, BATCH_SIZE, -1)
+        batch, _ = pipe.execute()
+
+        if not batch:
+            break
+
+        votes = [json.loads(vote) for vote in batch]
+        try:
+            _insert_votes(votes)
+            frappe.db.commit()
+        except Exception:
+            frappe.db.rollback()
+            # Put the batch back at the head of the queue for the next flush
+            pipe = queue.pipeline()
+            pipe.lpush(queue_key, *reversed(batch))
+            pipe.execute()
+            frappe.log_error("Failed to flush queued votes")
+            raise
+
+
+def _insert_votes(votes):
+    now = now_datetime()
+    user = frappe.session.user
+
+    rows = [
+        (
+            frappe.generate_hash(length=12),
+            now,
+            now,
+            user,
+            user,
+            vote["session"],
+            vote["question"],
+            vote["participant"],
+            vote["voter_ip"],
+            vote["vote_timestamp"],
+        )
+        for vote in votes
+    ]
+    frappe.db.bulk_insert("Game Vote", VOTE_FIELDS, rows, ignore_duplicates=True)
+
+    # Rows the unique key dropped (the voter already had a stored vote) are not
+    # under the names generated here
+    inserted = set(
+        frappe.get_all(
+            "Game Vote",
+            filters={"name": ("in", [row[0] for row in rows])},
+            pluck="name",
+        )
+    )
+
+    # Counters follow the table, so they are bumped once the batch is committed
+    questions = set()
+    for row, vote in zip(rows, votes):
+        if row[0] in inserted:
+            tally.record_vote(
+                vote["session"], vote["question"], vote["participant"], row[0]
+            )
+            questions.add((vote["session"], vote["question"]))
+        else:
+            # The claim named the dropped vote; let it be re-read from the stored one
+            vote_claims.release(vote["session"], vote["question"], vote["voter_ip"])
+
+    # Votes still queued when their question closed join its frozen results
+    for session_id, question_id in questions:
+        if result_snapshots.get_frozen_counts(session_id, question_id) is not None:
+            counts = tally.rebuild_counts(session_id, question_id)
+            result_snapshots.freeze(session_id, question_id, counts)
@@ -0,0 +1,93 @@
+# Copyright (c) 2025, Fun and Games and contributors
+# For license information, please see license.txt
+
+"""
+Signed voter tokens.
+
+Each phone gets a random voter id in a cookie, signed with the site's
+encryption key. Verifying it is one HMAC, needs no database row and gives the
+same id on every worker, unlike IP addresses that a whole office shares
+behind NAT. The id is what Game Vote stores as the voter.
+
+Tokens are only issued by the page loading endpoints. A vote without a valid
+token is refused, so dropping the cookie does not buy a fresh identity.
+"""
+
+import base64
+import hashlib
+import hmac
+import secrets
+
+import frappe
+from frappe.utils.password import get_encryption_key
+
+COOKIE_NAME = "fun_and_games_voter"
+COOKIE_MAX_AGE_DAYS = 365
+
+# 12 random bytes: a fixed 24 character hex id
+VOTER_ID_BYTES = 12
+SIGNATURE_BYTES = 16
+
+
+def _sign(voter_id):
+    digest = hmac.new(
+        get_encryption_key().encode(), voter_id.encode(), hashlib.sha256
+    ).digest()[:SIGNATURE_BYTES]
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def make_token(voter_id):
+    return f"{voter_id}.{_sign(voter_id)}"
+
+
+def verify(token):
+    """Voter id of a well-formed, correctly signed token, otherwise None"""
+    voter_id, _, signature = (token or "").partition(".")
+    if len(voter_id) != VOTER_ID_BYTES * 2 or not signature:
+        return None
+
+    if not hmac.compare_digest(signature, _sign(voter_id)):
+        return None
+
+    return voter_id
+
+
+def get_voter_id(issue=False):
+    """The requesting voter's id, or None without a valid token cookie.
+
+    With issue, a new token cookie is set instead; only page loads issue.
+    """
+    request = getattr(frappe.local, "request", None)
+    if request is None:
+        return None
+
+    # Remembered on the request so a newly issued id is used consistently
+    voter_id = getattr(request, "fun_and_games_voter_id", None)
+    if voter_id:
+        return voter_id
+
+    voter_id = verify(request.cookies.get(COOKIE_NAME))
+    if not voter_id:
+        if not issue:
+            return None
+
+        voter_id = secrets.token_hex(VOTER_ID_BYTES)
+        _set_cookie(make_token(voter_id))
+
+    request.fun_and_games_voter_id = voter_id
+    return voter_id
+
+
+def _set_cookie(token):
+    cookie_manager = getattr(frappe.local, "cookie_manager", None)
+    if not cookie_manager:
+        return
+
+    from frappe.utils import add_days, now_datetime
+
+    cookie_manager.set_cookie(
+        COOKIE_NAME,
+        token,
+        expires=add_days(now_datetime(), COOKIE_MAX_AGE_DAYS),
+        httponly=True,
+    )
@@ -133,6 +133,21 @@ app_license = "mit"
 # Scheduled Tasks
 # ---------------
 
+scheduler_events = {
+	"cron": {
+		# Safety net for votes left in the fast ingestion queue
+		"* * * * *": [
+			"fun_and_games.fun_and_games.vote_queue.flush_vote_queue",
+			# Closes due questions and auto-advances; reads and votes nudge it sooner
+			"fun_and_games.fun_and_games.question_timer.run_scheduled_close",
+		],
+	},
+	"daily_long": [
+		# Completed sessions whose votes were not archived when they ended
+		"fun_and_games.fun_and_games.vote_archive.archive_completed_sessions",
+	],
+}
+
 # scheduler_events = {
 # 	"all": [
 # 		"fun_and_games.tasks.all"
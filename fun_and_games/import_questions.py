@@ -2,14 +2,18 @@
 """
 Import Questions Script for Fun and Games App
 
-This script imports questions from a JSON file into the Game Question doctype.
+This script imports questions from a JSON, NDJSON or CSV file into the Game Question doctype.
+Files are read incrementally and questions are written in bulk batches, so large
+files import in seconds and never have to fit in memory.
 
 Usage:
-1. Create a JSON file with questions in the correct format
-2. Run: python import_questions.py questions.json
+1. Create a file with questions in the correct format
+2. Run: python import_questions.py questions.json [batch_size]
 3. Or run: bench execute fun_and_games.import_questions.import_from_file --kwargs "{'file_path': 'questions.json'}"
+4. Or run: bench --site [site-name] fun-and-games-import-questions questions.json
 
-JSON Format:
+JSON Format (a .ndjson / .jsonl file holds one such object per line,
+a .csv file has these keys as column headers):
 [
   {
     "question_text": "Who is most likely to work late?",
@@ -22,154 +26,267 @@ JSON Format:
 ]
 """
 
+import csv
+import io
 import json
-import sys
 import os
-import frappe
-
-
-def import_from_file(file_path):
-    """Import questions from a JSON file"""
-
-    # Check if file exists
-    if not os.path.exists(file_path):
-        print(f"❌ Error: File '{file_path}' not found!")
-        return False
+import sys
+import time
 
-    try:
-        # Read JSON file
-        with open(file_path, "r", encoding="utf-8") as f:
-            questions_data = json.load(f)
+import frappe
+from frappe.utils import cint, now_datetime
+
+DEFAULT_BATCH_SIZE = 500
+READ_CHUNK_SIZE = 64 * 1024
+
+FLAG_FIELDS = (
+    "is_active",
+    "for_leadership_track",
+    "for_backend_track",
+    "for_frontend_track",
+    "for_custom_sessions",
+)
+
+
+def normalize_question_text(text):
+    """Key used to detect duplicates: case and whitespace insensitive"""
+    return " ".join(text.split()).casefold()
+
+
+def detect_format(file_path):
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if extension == ".csv":
+        return "csv"
+    return "json"
+
+
+def iter_questions(stream, file_format="json"):
+    """Yield question dicts from a text stream without reading it all at once"""
+    if file_format == "ndjson":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    elif file_format == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        yield from _iter_json_array(stream)
+
+
+def _iter_json_array(stream):
+    """Incrementally decode the objects of a top-level JSON array"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    opened = False
+    exhausted = False
+
+    while True:
+        buffer = buffer.lstrip()
+
+        if not buffer:
+            if exhausted:
+                raise ValueError("Unexpected end of JSON array")
+            chunk = stream.read(READ_CHUNK_SIZE)
+            exhausted = not chunk
+            buffer += chunk
+        elif not opened:
+            if buffer[0] != "[":
+                raise ValueError("JSON must contain an array of questions!")
+            opened = True
+            buffer = buffer[1:]
+        elif buffer[0] == "]":
+            return
+        elif buffer[0] == ",":
+            buffer = buffer[1:]
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+                # The item continues in the next chunk
+                chunk = stream.read(READ_CHUNK_SIZE)
+                exhausted = not chunk
+                buffer += chunk
+                continue
+
+            yield item
+            buffer = buffer[end:]
+
+
+class QuestionImporter:
+    """Deduplicates questions in memory and bulk inserts them in batches"""
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+        self.batch_size = max(cint(batch_size), 1)
+        self.progress = progress or print_progress
+        self.batch = []
+        self.imported = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.started = time.monotonic()
+
+        # One query instead of an unindexed text lookup per question
+        self.seen = {
+            normalize_question_text(text)
+            for text in frappe.get_all("Game Question", pluck="question_text")
+            if text
+        }
+
+    @property
+    def skipped(self):
+        return self.duplicates + self.invalid
+
+    def add(self, question_data, index=None):
+        """Queue one question; returns False when it is skipped"""
+        if not isinstance(question_data, dict):
+            question_data = {}
+
+        question_text = question_data.get("question_text")
+        if not question_text or not str(question_text).strip():
+            print(f"⚠️  Skipping question {index}: Missing 'question_text'")
+            self.invalid += 1
+            return False
 
-        if not isinstance(questions_data, list):
-            print("❌ Error: JSON file must contain an array of questions!")
+        question_text = str(question_text).strip()
+        key = normalize_question_text(question_text)
+        if key in self.seen:
+            self.duplicates += 1
             return False
 
-        print(f"📖 Found {len(questions_data)} questions to import...")
+        self.seen.add(key)
+        self.batch.append(
+            (
+                question_text,
+                question_data.get("category") or "",
+                *(_flag(question_data.get(flag)) for flag in FLAG_FIELDS),
+            )
+        )
+        if len(self.batch) >= self.batch_size:
+            self.flush()
 
-        # Import questions
-        imported_count = 0
-        skipped_count = 0
+        return True
 
-        for i, question_data in enumerate(questions_data, 1):
-            try:
-                result = import_single_question(question_data, i)
-                if result:
-                    imported_count += 1
-                else:
-                    skipped_count += 1
+    def flush(self):
+        """Bulk insert and commit the pending batch"""
+        if not self.batch:
+            return
 
-            except Exception as e:
-                print(f"❌ Error importing question {i}: {str(e)}")
-                skipped_count += 1
+        from fun_and_games.fun_and_games.bulk_create import (
+            QUESTION_FIELDS,
+            get_naming_series,
+            reserve_names,
+        )
 
-        # Commit changes
+        now = now_datetime()
+        user = frappe.session.user
+        series = get_naming_series("Game Question")
+        names = reserve_names("Game Question", len(self.batch))
+
+        frappe.db.bulk_insert(
+            "Game Question",
+            QUESTION_FIELDS,
+            [
+                (name, now, now, user, user, series, *row)
+                for name, row in zip(names, self.batch)
+            ],
+        )
         frappe.db.commit()
 
-        print(f"\n✅ Import completed!")
-        print(f"   📥 Imported: {imported_count} questions")
-        print(f"   ⏭️  Skipped: {skipped_count} questions")
+        self.imported += len(self.batch)
+        self.batch = []
+        self.progress(self)
 
-        return True
+    def run(self, questions):
+        for index, question_data in enumerate(questions, 1):
+            self.add(question_data, index)
+        self.flush()
+        return self.stats()
 
-    except json.JSONDecodeError as e:
-        print(f"❌ Error: Invalid JSON format - {str(e)}")
-        return False
-    except Exception as e:
-        print(f"❌ Error: {str(e)}")
-        return False
+    def stats(self):
+        return {
+            "imported": self.imported,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "skipped": self.skipped,
+            "seconds": round(time.monotonic() - self.started, 2),
+        }
 
 
-def import_single_question(question_data, index=None):
-    """Import a single question"""
+def _flag(value):
+    # Missing flags (or empty CSV cells) default to on, as they always have
+    return 1 if value in (None, "") else cint(value)
 
-    # Validate required fields
-    if not question_data.get("question_text"):
-        print(f"⚠️  Skipping question {index}: Missing 'question_text'")
-        return False
 
-    question_text = question_data["question_text"].strip()
+def print_progress(importer):
+    elapsed = time.monotonic() - importer.started
+    rate = importer.imported / elapsed if elapsed else 0
+    print(
+        f"   📥 {importer.imported} imported, ⏭️  {importer.skipped} skipped "
+        f"({rate:.0f} questions/s)"
+    )
 
-    # Check if question already exists
-    existing = frappe.db.exists("Game Question", {"question_text": question_text})
-    if existing:
-        print(
-            f"⏭️  Skipping question {index}: Already exists - '{question_text[:50]}...'"
-        )
-        return False
 
-    try:
-        # Create Game Question document
-        question_doc = frappe.get_doc(
-            {
-                "doctype": "Game Question",
-                "question_text": question_text,
-                "category": question_data.get("category", ""),
-                "is_active": question_data.get("is_active", 1),
-                "for_leadership_track": question_data.get("for_leadership_track", 1),
-                "for_backend_track": question_data.get("for_backend_track", 1),
-                "for_frontend_track": question_data.get("for_frontend_track", 1),
-                "for_custom_sessions": question_data.get("for_custom_sessions", 1),
-            }
-        )
-
-        # Insert the document
-        question_doc.insert(ignore_permissions=True)
+def import_from_file(file_path, batch_size=DEFAULT_BATCH_SIZE, file_format=None):
+    """Import questions from a JSON, NDJSON or CSV file"""
 
-        print(f"✅ Imported question {index}: '{question_text[:50]}...'")
-        return True
-
-    except Exception as e:
-        print(f"❌ Error creating question {index}: {str(e)}")
+    # Check if file exists
+    if not os.path.exists(file_path):
+        print(f"❌ Error: File '{file_path}' not found!")
         return False
 
+    file_format = file_format or detect_format(file_path)
+    print(f"📖 Importing {file_format.upper()} questions from {file_path}...")
 
-def import_from_json_string(json_string):
-    """Import questions from a JSON string"""
     try:
-        questions_data = json.loads(json_string)
+        with open(file_path, "r", encoding="utf-8", newline="") as f:
+            return _import(iter_questions(f, file_format), batch_size)
 
-        if not isinstance(questions_data, list):
-            print("❌ Error: JSON must contain an array of questions!")
-            return False
+    except ValueError as e:
+        frappe.db.rollback()
+        print(f"❌ Error: Invalid {file_format.upper()} format - {str(e)}")
+        return False
+    except Exception as e:
+        frappe.db.rollback()
+        print(f"❌ Error: {str(e)}")
+        return False
 
-        print(f"📖 Found {len(questions_data)} questions to import...")
 
-        imported_count = 0
-        skipped_count = 0
+def import_from_json_string(json_string, batch_size=DEFAULT_BATCH_SIZE):
+    """Import questions from a JSON array or NDJSON string; returns the import stats"""
+    file_format = "json" if json_string.lstrip().startswith("[") else "ndjson"
 
-        for i, question_data in enumerate(questions_data, 1):
-            try:
-                result = import_single_question(question_data, i)
-                if result:
-                    imported_count += 1
-                else:
-                    skipped_count += 1
+    try:
+        return _import(iter_questions(io.StringIO(json_string), file_format), batch_size)
 
-            except Exception as e:
-                print(f"❌ Error importing question {i}: {str(e)}")
-                skipped_count += 1
+    except ValueError as e:
+        frappe.db.rollback()
+        print(f"❌ Error: Invalid JSON format - {str(e)}")
+        return False
 
-        frappe.db.commit()
 
-        print(f"\n✅ Import completed!")
-        print(f"   📥 Imported: {imported_count} questions")
-        print(f"   ⏭️  Skipped: {skipped_count} questions")
+def _import(questions, batch_size):
+    stats = QuestionImporter(batch_size).run(questions)
 
-        return True
+    print(f"\n✅ Import completed in {stats['seconds']}s!")
+    print(f"   📥 Imported: {stats['imported']} questions")
+    print(
+        f"   ⏭️  Skipped: {stats['skipped']} questions "
+        f"({stats['duplicates']} duplicates, {stats['invalid']} invalid)"
+    )
 
-    except json.JSONDecodeError as e:
-        print(f"❌ Error: Invalid JSON format - {str(e)}")
-        return False
+    return stats
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python import_questions.py <json_file_path>")
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python import_questions.py <file_path> [batch_size]")
         print("Example: python import_questions.py questions.json")
         sys.exit(1)
 
     file_path = sys.argv[1]
+    batch_size = int(sys.argv[2]) if len(sys.argv) == 3 else DEFAULT_BATCH_SIZE
 
     # Initialize Frappe if running standalone
     try:
@@ -184,5 +301,5 @@ if __name__ == "__main__":
         )
         sys.exit(1)
 
-    success = import_from_file(file_path)
+    success = import_from_file(file_path, batch_size)
     sys.exit(0 if success else 1)
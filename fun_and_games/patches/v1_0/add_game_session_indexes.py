@@ -0,0 +1,6 @@
+from fun_and_games.fun_and_games.doctype.game_session.game_session import on_doctype_update
+
+
+def execute():
+	"""Add the (status, creation) index behind the paginated session list"""
+	on_doctype_update()
@@ -0,0 +1,28 @@
+import frappe
+
+from fun_and_games.fun_and_games.doctype.game_vote.game_vote import on_doctype_update
+
+
+def execute():
+	"""Drop duplicate votes, then add the Game Vote dedup and tally indexes"""
+	duplicates = frappe.db.sql(
+		"""
+		SELECT session, question, voter_ip
+		FROM `tabGame Vote`
+		GROUP BY session, question, voter_ip
+		HAVING COUNT(*) > 1
+	""",
+		as_dict=True,
+	)
+
+	for vote in duplicates:
+		names = frappe.get_all(
+			"Game Vote",
+			filters=vote,
+			order_by="creation ASC",
+			pluck="name",
+		)
+		# Keep the first vote, as the old exists-check would have
+		frappe.db.delete("Game Vote", {"name": ("in", names[1:])})
+
+	on_doctype_update()
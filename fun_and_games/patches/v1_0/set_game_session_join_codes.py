@@ -0,0 +1,9 @@
+import frappe
+
+from fun_and_games.fun_and_games.doctype.game_session.game_session import generate_join_code
+
+
+def execute():
+	"""Give sessions created before join codes existed a code of their own"""
+	for name in frappe.get_all("Game Session", filters={"join_code": ("is", "not set")}, pluck="name"):
+		frappe.db.set_value("Game Session", name, "join_code", generate_join_code(), update_modified=False)
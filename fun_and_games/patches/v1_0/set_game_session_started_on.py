@@ -0,0 +1,12 @@
+import frappe
+
+
+def execute():
+	"""Sessions started before started_on existed: use their last change instead"""
+	frappe.db.sql(
+		"""
+		UPDATE `tabGame Session`
+		SET started_on = modified
+		WHERE status = 'Active' AND started_on IS NULL
+	"""
+	)
@@ -0,0 +1,186 @@
+// Copyright (c) 2025, Fun and Games and contributors
+// For license information, please see license.txt
+
+// Live session channel shared by the www pages.
+// Subscribes to the server's socket.io pushes and only polls while the socket is down.
+(function () {
+    const LIVE_EVENT = 'fun_and_games_session';
+
+    function getSocketHost(config) {
+        // Behind nginx socket.io shares the site origin; `bench start` serves it on its own port
+        if (config.socketioPort && window.location.port) {
+            return `${window.location.protocol}//${window.location.hostname}:${config.socketioPort}`;
+        }
+        return window.location.origin;
+    }
+
+    function loadSocketClient(host) {
+        return new Promise((resolve, reject) => {
+            if (window.io) {
+                resolve(window.io);
+                return;
+            }
+
+            const script = document.createElement('script');
+            script.src = `${host}/socket.io/socket.io.js`;
+            script.onload = () => window.io ? resolve(window.io) : reject(new Error('socket.io client missing'));
+            script.onerror = () => reject(new Error('socket.io client unavailable'));
+            document.head.appendChild(script);
+        });
+    }
+
+    // taskId also subscribes to the server's pushes for that task, e.g. a session setup request
+    window.connectLiveChannel = function ({ onEvent, poll, pollInterval, onStatusChange, taskId }) {
+        const config = window.liveChannelConfig || {};
+        let pollTimer = null;
+        let socket = null;
+
+        function startPolling() {
+            if (pollTimer) return;
+            pollTimer = setInterval(poll, pollInterval);
+            if (onStatusChange) onStatusChange(false);
+        }
+
+        function stopPolling() {
+            if (pollTimer) {
+                clearInterval(pollTimer);
+                pollTimer = null;
+            }
+        }
+
+        // Poll until the socket is confirmed up
+        poll();
+        startPolling();
+
+        const host = getSocketHost(config);
+        loadSocketClient(host)
+            .then(io => {
+                socket = io(`${host}/${config.sitename}`, { withCredentials: true });
+
+                socket.on('connect', () => {
+                    // Rooms are per connection, so join again after every reconnect
+                    if (taskId) socket.emit('task_subscribe', taskId);
+                    stopPolling();
+                    // Resync once in case anything changed while we were disconnected
+                    poll();
+                    if (onStatusChange) onStatusChange(true);
+                });
+                socket.on('disconnect', startPolling);
+                socket.on('connect_error', startPolling);
+                socket.on(LIVE_EVENT, onEvent);
+            })
+            .catch(error => {
+                console.warn('Live channel unavailable, polling instead:', error);
+            });
+
+        return {
+            isLive: () => Boolean(socket && socket.connected),
+            pause: () => {
+                stopPolling();
+                if (socket) socket.disconnect();
+            },
+            resume: () => {
+                if (socket) {
+                    socket.connect();
+                }
+                poll();
+                startPolling();
+            }
+        };
+    };
+
+    // Pages serve one game given by ?session=<session name or join code>.
+    // Without it the server falls back to the most recently started session.
+    const sessionParam = new URLSearchParams(window.location.search).get('session');
+
+    window.sessionScope = {
+        param: sessionParam,
+        url: function (path) {
+            if (!sessionParam) return path;
+            const separator = path.includes('?') ? '&' : '?';
+            return `${path}${separator}session=${encodeURIComponent(sessionParam)}`;
+        },
+        // True when a live event belongs to another game than the one on screen
+        isOtherSession: function (event, currentSessionId) {
+            if (!currentSessionId || event.session_id === currentSessionId) return false;
+            // An unscoped page follows whichever session was started last
+            return !(event.type === 'session_started' && !sessionParam);
+        }
+    };
+
+    // Participant roster of the game on screen, kept in localStorage so compact
+    // responses carry the roster only when it changed and refer to participants by index.
+    const ROSTER_STORAGE_KEY = `fun_and_games_roster:${sessionParam || ''}`;
+    let storedRoster = null;
+
+    function loadRoster() {
+        if (!storedRoster) {
+            try {
+                storedRoster = JSON.parse(localStorage.getItem(ROSTER_STORAGE_KEY));
+            } catch (error) {
+                storedRoster = null;
+            }
+        }
+        return storedRoster;
+    }
+
+    window.participantRoster = {
+        // Endpoint URL asking for the compact payload against the roster we hold
+        url: function (path) {
+            const roster = loadRoster();
+            const separator = path.includes('?') ? '&' : '?';
+            const version = roster ? `&roster_version=${encodeURIComponent(roster.version)}` : '';
+            return window.sessionScope.url(`${path}${separator}compact=1${version}`);
+        },
+        version: function () {
+            const roster = loadRoster();
+            return roster ? roster.version : null;
+        },
+        // Roster entries ([participant_name, team], by index) a compact response refers to,
+        // or null when the one we hold is not it
+        resolve: function (data) {
+            if (data.roster) {
+                storedRoster = { version: data.roster_version, roster: data.roster };
+                try {
+                    localStorage.setItem(ROSTER_STORAGE_KEY, JSON.stringify(storedRoster));
+                } catch (error) {
+                    // Private browsing: keep it in memory only
+                }
+            }
+
+            const roster = loadRoster();
+            return roster && roster.version === data.roster_version ? roster.roster : null;
+        },
+        forget: function () {
+            storedRoster = null;
+            try {
+                localStorage.removeItem(ROSTER_STORAGE_KEY);
+            } catch (error) {
+                // Nothing stored
+            }
+        }
+    };
+
+    // GET a read endpoint with If-None-Match; on 304 the last payload is reused.
+    // Resolves to { data, changed } so pages can skip re-rendering unchanged state.
+    const etagCache = new Map();
+
+    window.fetchConditional = async function (url) {
+        const cached = etagCache.get(url);
+        const headers = cached ? { 'If-None-Match': cached.etag } : {};
+
+        const response = await fetch(url, { headers });
+        if (response.status === 304 && cached) {
+            return { data: cached.data, changed: false };
+        }
+
+        const data = await response.json();
+        const etag = response.headers.get('ETag');
+        if (etag) {
+            etagCache.set(url, { etag, data });
+        } else {
+            etagCache.delete(url);
+        }
+        return { data, changed: true };
+    };
+})();
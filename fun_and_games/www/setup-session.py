@@ -1,5 +1,8 @@
 import frappe
 
+from fun_and_games.fun_and_games import question_catalog
+from fun_and_games.fun_and_games.live import get_channel_config
+
 
 # def get_context(context):
 #     # This page requires admin access
@@ -146,38 +149,13 @@ def get_context(context):
 
     context.no_cache = 1
     context.show_sidebar = False
+    context.live_channel = get_channel_config()
     context.questions = []
     context.existing_participants = []
 
     try:
-        # Get questions from Game Settings JSON field
-        settings = frappe.get_single("Game Settings")
-        questions_json = settings.get("questions_json", "[]")
-
-        if questions_json:
-            import json
-
-            context.questions = json.loads(questions_json)
-        else:
-            # Fallback: provide sample questions structure
-            context.questions = [
-                {
-                    "name": "Q1",
-                    "question_text": "Who is most likely to work late?",
-                    "for_leadership_track": 1,
-                    "for_backend_track": 1,
-                    "for_frontend_track": 0,
-                    "for_custom_sessions": 0,
-                },
-                {
-                    "name": "Q2",
-                    "question_text": "Who is most likely to debug on weekends?",
-                    "for_leadership_track": 0,
-                    "for_backend_track": 1,
-                    "for_frontend_track": 1,
-                    "for_custom_sessions": 0,
-                },
-            ]
+        # Parsed once per Game Settings change by the question catalog
+        context.questions = question_catalog.get_questions()
 
     except Exception as e:
         frappe.log_error(
@@ -1,6 +1,9 @@
 import frappe
 
+from fun_and_games.fun_and_games.live import get_channel_config
+
 def get_context(context):
 	context.no_cache = 1
 	context.show_sidebar = False
+	context.live_channel = get_channel_config()
 	return context